@@ -0,0 +1,290 @@
+"""
+****************************************************************************************************
+
+                            ----Sudoku Bitboard Constraint Engine----
+
+****************************************************************************************************
+
+Purpose:
+    A faster engine for filling Sudoku boards. Instead of rebuilding lists of taken values for every
+    square like validate_square() does, the engine keeps one bit mask for each row, column and box.
+    Bit (n - 1) of a mask is set when the number n has been placed in that row/column/box, so the
+    candidates of a square are simply the bits that are free in all three of its masks.
+
+Operation:
+    Squares are addressed by a flat index (row * size + col) and the tables below map each index to its
+    row, column and box. Placing a number ORs its bit into the three masks and pushes the square onto a
+    history stack, undo() pops the stack and clears the same bits, so both are O(1). fill() uses these to
+    run a randomized backtracking search that always expands the square with the fewest candidates,
+    which finds a full valid board without any restarts.
+
+Sizes:
+    The engine works for any box size, a box of 3 gives the normal 9 by 9 board, 4 gives 16 by 16 and 5
+    gives 25 by 25. The tables for each size are built once by layout(). Large boards can run into long
+    searches, so fill() accepts a limit on the number of placements and generate() restarts with a fresh
+    board whenever that limit is hit, which keeps the time per board bounded.
+
+"""
+
+import numpy as np
+import time
+
+
+#number of set bits for every 16-bit mask
+COUNT16 = [bin(m).count("1") for m in range(1 << 16)]
+
+
+class Layout:
+
+    def __init__(self, box):
+
+        size = box * box
+        self.box = box
+        self.size = size
+        self.squares = size * size
+        self.full = (1 << size) - 1     #all bits set, every number is still possible
+
+        #lookup tables from a flat square index to its row, column and box
+        self.row_of = [i // size for i in range(self.squares)]
+        self.col_of = [i % size for i in range(self.squares)]
+        self.box_of = [
+            (i // (size * box)) * box + (i % size) // box for i in range(self.squares)
+        ]
+
+        #bit for each number (index 0 is unused so bit[num] can be used directly)
+        self.bit = [0] + [1 << (n - 1) for n in range(1, size + 1)]
+
+        #counts and lists of numbers for every possible mask where the tables stay small
+        if size <= 9:
+            table = [[n for n in range(1, size + 1) if m & self.bit[n]] for m in range(self.full + 1)]
+            self.digits = table.__getitem__
+            self.count = [len(d) for d in table].__getitem__
+        elif size <= 16:
+            self.digits = self.mask_digits
+            self.count = COUNT16.__getitem__
+        else:
+            self.digits = self.mask_digits
+            self.count = self.mask_count
+
+    def mask_digits(self, mask):
+        return [n for n in range(1, self.size + 1) if mask & self.bit[n]]
+
+    #counts bits 16 at a time, tables for every 25-bit mask would be far too large
+    def mask_count(self, mask):
+        return COUNT16[mask & 0xFFFF] + COUNT16[mask >> 16]
+
+
+LAYOUTS = {}
+
+
+def layout(box):
+    if box not in LAYOUTS:
+        LAYOUTS[box] = Layout(box)
+    return LAYOUTS[box]
+
+
+#tables of the standard 9 by 9 board, used directly by other modules
+STANDARD = layout(3)
+FULL = STANDARD.full
+ROW_OF = STANDARD.row_of
+COL_OF = STANDARD.col_of
+BOX_OF = STANDARD.box_of
+BIT = STANDARD.bit
+DIGITS = [STANDARD.digits(m) for m in range(FULL + 1)]
+COUNT = [len(d) for d in DIGITS]
+
+
+class Bitboard:
+
+    def __init__(self, puzzle = None, box = 3):
+
+        self.layout = layout(box)
+        self.size = self.layout.size
+        self.cells = [0] * self.layout.squares
+        self.rows = [0] * self.size
+        self.cols = [0] * self.size
+        self.boxes = [0] * self.size
+        self.history = []   #stack of square indexes in the order they were placed
+        self.nodes = 0      #placements made by fill()
+        self.backtracks = 0 #placements undone by fill()
+
+        #optionally start from an existing (possibly partial) board, zeroes are empty squares
+        if puzzle is not None:
+            size = self.size
+            for idx, num in enumerate(np.asarray(puzzle).reshape(-1).tolist()):
+                if num:
+                    if not self.candidates(idx // size, idx % size) & self.layout.bit[num]:
+                        raise ValueError("conflicting value %d at (%d, %d)" % (num, idx // size, idx % size))
+                    self.set(idx, num)
+
+    #mask of the numbers that can still be placed at (row, col)
+    def candidates(self, row, col):
+        idx = row * self.size + col
+        return self.layout.full & ~(self.rows[row] | self.cols[col] | self.boxes[self.layout.box_of[idx]])
+
+    #list version of candidates(), mostly useful outside of the engine
+    def options(self, row, col):
+        return self.layout.digits(self.candidates(row, col))
+
+    def place(self, row, col, num):
+        self.set(row * self.size + col, num)
+
+    #places a number by its flat index and records it for undo()
+    def set(self, idx, num):
+        lay = self.layout
+        bit = lay.bit[num]
+        self.cells[idx] = num
+        self.rows[lay.row_of[idx]] |= bit
+        self.cols[lay.col_of[idx]] |= bit
+        self.boxes[lay.box_of[idx]] |= bit
+        self.history.append(idx)
+
+    #removes the most recently placed number, returns its index
+    def undo(self):
+        lay = self.layout
+        idx = self.history.pop()
+        bit = ~lay.bit[self.cells[idx]]
+        self.cells[idx] = 0
+        self.rows[lay.row_of[idx]] &= bit
+        self.cols[lay.col_of[idx]] &= bit
+        self.boxes[lay.box_of[idx]] &= bit
+        return idx
+
+    """
+    *********************************************************************************************
+    *
+    *                               -- most_constrained() --
+    *
+    *   Purpose: Find the empty square with the fewest candidates
+    *   Parameters: None
+    *   Return Values: (index, mask) of that square, or (-1, 0) when the board is full
+    *
+    *   Operation: Scans the empty squares once, stopping early if a square with zero or one
+    *   candidates is found since nothing can be more constrained than that
+    *
+    *********************************************************************************************
+    """
+    def most_constrained(self):
+
+        lay = self.layout
+        full, count, row_of, col_of, box_of = lay.full, lay.count, lay.row_of, lay.col_of, lay.box_of
+        best, best_mask, best_count = -1, 0, self.size + 1
+        cells, rows, cols, boxes = self.cells, self.rows, self.cols, self.boxes
+        for idx in range(lay.squares):
+            if cells[idx]:
+                continue
+            mask = full & ~(rows[row_of[idx]] | cols[col_of[idx]] | boxes[box_of[idx]])
+            n = count(mask)
+            if n < best_count:
+                best, best_mask, best_count = idx, mask, n
+                if n <= 1:
+                    break
+        return best, best_mask
+
+    """
+    *********************************************************************************************
+    *
+    *                               -- fill() --
+    *
+    *   Purpose: Fill every empty square of the board with valid random numbers
+    *   Parameters: rng - source of randomness (anything with shuffle(), a puzzle's own rng)
+    *               limit - give up after this many placements, None for no limit
+    *   Return Values: True if the board was completed, False if the given squares have no solution
+    *                  or the limit was reached (the board is then left partly filled)
+    *
+    *   Operation: Iterative backtracking. Each stack frame holds a square and the shuffled numbers
+    *   that have not been tried there yet. A frame with no numbers left is popped and the
+    *   placement of the frame below it is undone, so the board is never reset or reallocated
+    *
+    *********************************************************************************************
+    """
+    def fill(self, rng, limit = None):
+
+        digits = self.layout.digits
+        idx, mask = self.most_constrained()
+        if idx < 0:
+            return True
+        opts = digits(mask)[:]
+        rng.shuffle(opts)
+        stack = [(idx, opts)]
+
+        while stack:
+            idx, opts = stack[-1]
+
+            #every number failed for this square, backtrack into the previous one
+            if not opts:
+                stack.pop()
+                if stack:
+                    self.undo()
+                    self.backtracks += 1
+                continue
+
+            if limit is not None and self.nodes >= limit:
+                return False
+            self.set(idx, opts.pop())
+            self.nodes += 1
+            idx, mask = self.most_constrained()
+            if idx < 0:
+                return True
+            opts = digits(mask)[:]
+            rng.shuffle(opts)
+            stack.append((idx, opts))
+
+        return False
+
+    #returns the board as a size by size numpy array, matching Sudoku.puzzle
+    def to_array(self):
+        return np.array(self.cells, dtype=np.int64).reshape(self.size, self.size)
+
+
+"""
+*********************************************************************************************
+*
+*                               -- generate() --
+*
+*   Purpose: Make a full random board of any size in bounded time
+*   Parameters: box - box size (3 for 9 by 9, 4 for 16 by 16, 5 for 25 by 25)
+*               rng - source of randomness (anything with shuffle(), a puzzle's own rng)
+*               limit - placements allowed per try before starting over, None picks a default
+*                       of twice the number of squares
+*               attempts - tries allowed before giving up, None for no limit
+*               timeout - seconds before giving up completely, None for no limit
+*               stats - optional dict, its "attempts" and "backtracks" counters are increased
+*   Return Values: a filled Bitboard, or None if attempts or timeout ran out
+*
+*   Operation: The boxes on the main diagonal share no rows or columns, so they are first filled
+*   with random permutations without any search. fill() completes the rest, and a try that needs
+*   more than limit placements is abandoned for a fresh board, since a long search on a large
+*   board almost never recovers while a new start usually finishes quickly
+*
+*********************************************************************************************
+"""
+def generate(box, rng, limit = None, attempts = None, timeout = None, stats = None):
+
+    lay = layout(box)
+    if limit is None:
+        limit = lay.squares * 2
+    if stats is None:
+        stats = {}
+    start = time.perf_counter()
+    tries = 0
+
+    while attempts is None or tries < attempts:
+        tries += 1
+        stats["attempts"] = stats.get("attempts", 0) + 1
+        board = Bitboard(box=box)
+        for b in range(box):
+            nums = list(range(1, lay.size + 1))
+            rng.shuffle(nums)
+            for k, num in enumerate(nums):
+                row = b * box + k // box
+                col = b * box + k % box
+                board.place(row, col, num)
+
+        done = board.fill(rng, limit)
+        stats["backtracks"] = stats.get("backtracks", 0) + board.backtracks
+        if done:
+            return board
+        if timeout is not None and time.perf_counter() - start > timeout:
+            return None
+    return None
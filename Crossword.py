@@ -28,42 +28,46 @@
 *  nearly every square is filled, non-colliding words can never touch each other, or border, the algorithm must check this in the
 *  placement too and only mark it as valid if it does not touch.
 * 
-*  Step 5: Repeat and recurse as necessary
-*  The algorithm will try the above steps until the word bank is empty and every word is placed. It will skip words if they do not
-*  have a placement and try the next if one is available. However, the algorithm will fail if no more words can be placed. Due to 
-*  the randomicity of the algorithm, this does not mean that the word bank is invalid, and it will recurse up to a set number of 
-*  trys attempting to make a valid puzzle.
+*  Step 5: Search and backtrack as necessary
+*  The words are ordered by how constrained they are, those sharing the fewest letters with the rest of the bank first, and each
+*  step places the first word in that order that has a valid placement, at a random one of them. A word that has none yet is
+*  skipped until the words placed after it give it a crossing. If no remaining word can be placed, the last placement is undone on
+*  the grid and its next placement is tried, depth first, instead of clearing the puzzle. After a number of backtracks (doubling
+*  every time) the search starts over from a new first word. It gives up once the max_nodes/timeout budget is used up, or when
+*  searches from 20 different first words have run out of placements to try, as the bank then almost surely cannot be laid out.
+*  self.stats records the placements tried, the backtracks and the restarts.
 *
 **************************************************************************************************************************************
 """
 import numpy as np
-import random as r
 import json
+import time
 from Puzzle import Puzzle
 
 class Crossword(Puzzle):
 
     def __init__(self, word_bank = None, questions = None,
-        name = None, creator = None, subject = None):
+        name = None, creator = None, subject = None, seed = None, max_nodes = 50000, timeout = None):
 
-        super().__init__(name, creator, subject)
+        super().__init__(name, creator, subject, seed)
         self.questions = questions
         self.word_bank = word_bank
         self.word_bank.sort(key=len)
         self.word_bank.reverse()
         self.reserved = []
-        self.skipped = []
-        self.trys = 0
+        self.added = []         #(rows, cols) of the squares each reserved word filled, for undo()
+        self.letters = {}       #ascii -> set of (row, col, horizontal) of the placed squares holding it
+        self.max_nodes = max_nodes      #placements the search may try, None means no limit
+        self.timeout = timeout          #seconds the search may take, None means no limit
+        self.reset_stats()
+        self.solved = False
         self.puz_json = None
         if self.word_bank:
             self.puz_size = int(len(self.word_bank) * 1.8)
             ls = self.longest_string(self.word_bank)
             if self.puz_size < ls:
                 self.puz_size = int(ls * 1.5)
-            self.puzzle = np.zeros(
-                (self.puz_size, self.puz_size), dtype=np.int
-            )
-            self.make_puzzle()
+            self.solved = self.make_puzzle()
             self.puz_json = json.dumps(self.puzzle.tolist())
 
 
@@ -71,14 +75,12 @@ class Crossword(Puzzle):
     def first_word(self, word):
 
         warr = self.word_array(word)
-        row = r.randint((self.puz_size//4), self.puz_size-(self.puz_size//4))
-        col = r.randint(0, self.puz_size-len(warr))
+        row = self.rng.randint((self.puz_size//4), self.puz_size-(self.puz_size//4))
+        col = self.rng.randint(0, self.puz_size-len(warr))
         check = []
         for i, v in enumerate(warr):
             check.append((row, col+i, v))
-        self.reserved.append(check)
-        for i in check:
-            self.puzzle[i[0], i[1]] = i[2]
+        self.place(check)
 
     #checks if the word is horizontal
     def is_horizontal(self, check):
@@ -101,172 +103,144 @@ class Crossword(Puzzle):
     *   Parameters: word - the word to check
     *   Return Values: List of tuples containing the coordinates and orientation of the intersection
     *
-    *   Operation: Loops through all characters in the words that have been placed and compares them
-    *   to the characters of the parameter word. Also checks the placement of the word against the
-    *   boundaries of the puzzle
+    *   Operation: Looks up every character of the word in self.letters, the placed squares holding
+    *   that character, instead of looping through all placed words. A square already crossed by two
+    *   words is skipped, as is a placement whose ends (with a blank square on either side) leave the
+    *   puzzle
     *
     *********************************************************************************************
     """
     def find_intersections(self, word):
 
         intersections = []
-        word1 = self.word_array(word)
-        for check in self.reserved:
-            for i, v in enumerate(check):
-                for j, val in enumerate(word1):
-                    if v[2]==val:
-
-                        #horizontal 
-                        if self.is_horizontal(check):
-                            row = v[0]-j
-                            if row >=0 and row <= self.puz_size:
-
-                                #boundary checking
-                                if v[1]>0:
-                                    left = self.puzzle[row, v[1]-1]
-                                    if left == 0:
-                                        intersections.append((row, v[1], 1))
-                                if v[1]+len(word1) < self.puz_size-1:
-                                    right = self.puzzle[row, v[1]+len(word1)]
-                                    if right == 0:
-                                        intersections.append((row, v[1], 1))
-
-                        #vertical
-                        else:
-                            col = v[1]-j
-                            if col >=0 and col <= self.puz_size:
-                                if v[0]>0:
-                                    top = self.puzzle[v[0]-1, col]
-                                    if top == 0:
-                                        intersections.append((v[0], col, 0))
-                                if v[0]+len(word1) < self.puz_size-1:
-                                    bot = self.puzzle[v[0]+len(word1), col]
-                                    if bot == 0:
-                                        intersections.append((v[0], col, 0))
+        word1 = self.word_array(word).tolist()
+        length = len(word1)
+        for j, val in enumerate(word1):
+            squares = self.letters.get(val)
+            if not squares:
+                continue
+            for row, col, horizontal in squares:
+                if (row, col, not horizontal) in squares:
+                    continue
+
+                #crossing a horizontal word makes a vertical placement and the other way around
+                if horizontal:
+                    start = row - j
+                    if start >= 1 and start + length < self.puz_size:
+                        intersections.append((start, col, 1))
+                else:
+                    start = col - j
+                    if start >= 1 and start + length < self.puz_size:
+                        intersections.append((row, start, 0))
 
         return intersections
 
+    #commits a placement, the list of (row, col, ascii) tuples from validate_word(), to the puzzle,
+    #self.letters and the masks used by fits()
+    def place(self, check):
+        self.reserved.append(check)
+        horizontal = len(check) < 2 or self.is_horizontal(check)
+        rows = np.array([c[0] for c in check])
+        cols = np.array([c[1] for c in check])
+        new = self.puzzle[rows, cols] == 0
+        rows, cols = rows[new], cols[new]
+        self.added.append((rows, cols))
+
+        #new letters block new across letters above and below them, and new down letters beside them
+        self.near[0, rows, cols + 1] += 1
+        self.near[0, rows + 2, cols + 1] += 1
+        self.near[1, rows + 1, cols] += 1
+        self.near[1, rows + 1, cols + 2] += 1
+        for row, col, val in check:
+            self.puzzle[row, col] = val
+            self.covered[0 if horizontal else 1, row, col] = True
+            self.letters.setdefault(int(val), set()).add((row, col, horizontal))
+
+    #takes the last placement back off the puzzle, the reverse of place()
+    def undo(self):
+        check = self.reserved.pop()
+        rows, cols = self.added.pop()
+        horizontal = len(check) < 2 or self.is_horizontal(check)
+        self.near[0, rows, cols + 1] -= 1
+        self.near[0, rows + 2, cols + 1] -= 1
+        self.near[1, rows + 1, cols] -= 1
+        self.near[1, rows + 1, cols + 2] -= 1
+        self.puzzle[rows, cols] = 0
+        for row, col, val in check:
+            self.covered[0 if horizontal else 1, row, col] = False
+            self.letters[int(val)].discard((row, col, horizontal))
+
     """
     *********************************************************************************************
     *
-    *                               -- catch_overlap() --
+    *                               -- fits() --
     *
-    *   Purpose: Determine if a given word borders another in-line, that is they would form a 
-    *   seemingly too long word on the puzzle without whitespace
-    *   Parameters: word - word to be checked
-    *   Return Values: Boolean of whether the word placement is valid
+    *   Purpose: Checks many placements of a word at once against the puzzle
+    *   Parameters: word - the word to place
+    *               placements - list of (row, col, orientation) from find_intersections()
+    *   Return Values: boolean numpy array, True for the placements that are valid
     *
-    *   Operation: Compares the first and last characters of a word against already placed words
-    *   The only collision allowed is when one is if they are not the same orientation, otherwise
-    *   the placement is invalid
+    *   Operation: A placement is valid when the squares before and after it are in the puzzle and
+    *   blank, and each of its squares either holds the same character and is not already part of
+    *   a word of the same orientation (self.covered), or is blank and has no letter beside it
+    *   across the word (self.near, counts of the letters above and below every square for
+    *   across words and left and right of it for down words, padded by one square on every side).
+    *   Only the squares of the placement are read, so a placement costs the same however many
+    *   words are placed, and all of them are checked together as (placements, length) arrays
     *
     *********************************************************************************************
     """
+    def fits(self, word, placements):
+
+        warr = self.word_array(word)
+        starts = np.array(placements, dtype=np.int64).reshape(-1, 3)
+        orient = starts[:, 2]
+        down = (orient == 1)[:, None]
+        steps = np.arange(len(warr))
+        rows = starts[:, :1] + down * steps
+        cols = starts[:, 1:2] + ~down * steps
+
+        #squares before and after the word, placements running off the puzzle are dropped first
+        before_r, before_c = rows[:, 0] - down[:, 0], cols[:, 0] - ~down[:, 0]
+        after_r, after_c = rows[:, -1] + down[:, 0], cols[:, -1] + ~down[:, 0]
+        ok = (before_r >= 0) & (before_c >= 0) & (after_r < self.puz_size) & (after_c < self.puz_size)
+        inside = np.flatnonzero(ok)
+        rows, cols, orient = rows[inside], cols[inside], orient[inside, None]
+
+        squares = self.puzzle[rows, cols]
+        filled = squares != 0
+        crossing = filled & (squares == warr) & ~self.covered[orient, rows, cols]
+        blank = ~filled & (self.near[orient, rows + 1, cols + 1] == 0)
+        ok[inside] = ((self.puzzle[before_r[inside], before_c[inside]] == 0)
+            & (self.puzzle[after_r[inside], after_c[inside]] == 0) & (crossing | blank).all(axis=1))
+        return ok
+
+    #rows, cols and ascii values of a placement's (row, col, ascii) tuples, and its orientation (0 across, 1 down)
+    def unpack(self, check):
+        rows = np.array([c[0] for c in check])
+        cols = np.array([c[1] for c in check])
+        vals = np.array([c[2] for c in check])
+        return rows, cols, vals, 0 if len(check) < 2 or self.is_horizontal(check) else 1
+
+    #the two halves of fits() for a single placement, kept for callers of the old checks
+    #True if every square of the placement is blank or crosses a word of the other orientation at the same letter
     def catch_overlap(self, check):
-        for t in check:
-            for word in self.reserved:
-                for tup in word:
-                    if t[0] == tup[0] and t[1] == tup[1]:
-                        if t[2] != tup[2]:
-                            return False
-        for word in self.reserved:
-            first = word[0]
-            last = word[-1]
-
-            #horizontal
-            if self.is_horizontal(check):
-                for tp in check:
-                    if tp[0] > 0:
-                        top = tp[0]-1
-                        if top == first[0] and tp[1]==first[1]:
-                            return False
-                        if top == last[0] and tp[1] == last[1]:
-                            return False
-                    if tp[0] < (self.puz_size-1):
-                        bot = tp[0]+1
-                        if bot == first[0] and tp[1]==first[1]:
-                            return False
-                        if bot == last[0] and tp[1] == last[1]:
-                            return False
-            
-            #vertical
-            else:
-                for tp in check:
-                    if tp[1] > 0:
-                        left = tp[1]-1
-                        if left == first[1] and tp[0]==first[0]:
-                            return False
-                        if left == last[1] and tp[0]==last[0]:
-                            return False
-                    if tp[1] < (self.puz_size-1):
-                        right = tp[1]+1
-                        if right == first[1] and tp[0]==first[0]:
-                            return False
-                        if right == last[1] and tp[0]==last[0]:
-                            return False
-        return True
+        rows, cols, vals, orient = self.unpack(check)
+        squares = self.puzzle[rows, cols]
+        return bool(((squares == 0) | (squares == vals) & ~self.covered[orient, rows, cols]).all())
 
-    """
-    *********************************************************************************************
-    *
-    *                               -- check_surroundings() --
-    *
-    *   Purpose: Catches bordering of words, they cannot be touching unless there is a valid 
-    *   collision
-    *   Parameters: word - word to be checked
-    *   Return Values: Boolean of whether the word placement is valid
-    *
-    *   Operation: Loops through the check word and compares neighboring rows/columns and checks
-    *   if a word exists in that space
-    *
-    *********************************************************************************************
-    """
+    #True if the squares before and after the placement are in the puzzle and blank, and no blank square of it
+    #has a letter beside it across the word
     def check_surroundings(self, check):
-
-        if self.is_horizontal(check):
-            row = check[0][0]
-            leftS = check[0][1]-1
-            rightS = check[-1][1]+1
-            if leftS < 0 or rightS > self.puz_size-1:
-                return False
-            if self.puzzle[row, leftS] != 0 or self.puzzle[row, rightS] != 0:
-                return False
-            for i in range(1, len(check)):
-                if row > 0:
-                    above = row-1
-                    tl_square = self.puzzle[above, check[i-1][1]]
-                    tr_square = self.puzzle[above, check[i][1]]
-                    if tl_square != 0 and tr_square != 0:
-                        return False
-                if row < self.puz_size-1:
-                    below = row + 1
-                    bl_square = self.puzzle[below, check[i-1][1]]
-                    br_square = self.puzzle[below, check[i][1]]
-                    if bl_square != 0  and br_square != 0:
-                        return False
-        else:
-            col = check[0][1]
-            topS = check[0][0]-1
-            botS = check[-1][0]+1
-            if topS < 0 or botS > self.puz_size-1:
-                return False
-            if self.puzzle[topS, col] != 0 or self.puzzle[botS, col] != 0:
-                return False
-            for j in range(1, len(check)):
-                if col>0:
-                    left = col - 1
-                    lt_square = self.puzzle[check[j-1][0], left]
-                    lb_square = self.puzzle[check[j][0], left]
-                    if lt_square != 0 and lb_square != 0:
-                        return False
-
-                if col < self.puz_size-1:
-                    right = col + 1
-                    rt_square = self.puzzle[check[j-1][0], right]
-                    rb_square = self.puzzle[check[j][0], right]
-                    if rt_square != 0 and rb_square != 0:
-                        return False
-        return True
+        rows, cols, vals, orient = self.unpack(check)
+        before = (rows[0] - orient, cols[0] - (1 - orient))
+        after = (rows[-1] + orient, cols[-1] + (1 - orient))
+        if min(before) < 0 or max(after) >= self.puz_size:
+            return False
+        if self.puzzle[before] != 0 or self.puzzle[after] != 0:
+            return False
+        blank = self.puzzle[rows, cols] == 0
+        return bool((self.near[orient, rows[blank] + 1, cols[blank] + 1] == 0).all())
 
     """
     *********************************************************************************************
@@ -279,27 +253,72 @@ class Crossword(Puzzle):
     *   Return Values: list of ascii characters to be placed if the placement is valid, otherwise
     *   an empty list (false)
     *
-    *   Operation: Checks if intersections exist, then randomizes them. Then calls the validity 
-    *   functions to see if the placement is valid. Once one is found, returns the placement
+    *   Operation: Finds the intersections and checks all of them with fits(), then returns a
+    *   random one of the valid placements
     *
     *********************************************************************************************
     """
     def validate_word(self, word):
 
+        options = self.placements(word)
+        if not options:
+            return []
+        return self.spell(word, self.rng.choice(options))
+
+    #the valid (row, col, orientation) placements of a word
+    def placements(self, word):
         intersections = self.find_intersections(word)
         if not intersections:
             return []
+        valid = self.fits(word, intersections)
+        return [i for i, ok in zip(intersections, valid) if ok]
+
+    #the (row, col, ascii) tuples of a word at a placement
+    def spell(self, word, i):
         warr = self.word_array(word)
-        r.shuffle(intersections)
-        for i in intersections:
-            if i[2] == 0:
-                check = [(i[0], i[1]+j, warr[j]) for j in range(0, len(warr))]
-            else:
-                check = [(i[0]+k, i[1], warr[k]) for k in range(0, len(warr))]
-            if self.catch_overlap(check):
-                if self.check_surroundings(check):
-                    return check
-        return []
+        if i[2] == 0:
+            return [(i[0], i[1]+j, warr[j]) for j in range(0, len(warr))]
+        return [(i[0]+k, i[1], warr[k]) for k in range(0, len(warr))]
+
+    #clears the puzzle, the placed words and the masks
+    def clear(self):
+        self.puzzle = np.zeros((self.puz_size, self.puz_size), dtype=np.int64)
+        self.covered = np.zeros((2, self.puz_size, self.puz_size), dtype=bool)     #squares in across, down words
+        self.near = np.zeros((2, self.puz_size + 2, self.puz_size + 2), dtype=np.uint8)   #see fits()
+        self.reserved.clear()
+        self.added.clear()
+        self.letters.clear()
+
+    #clears the search counters, called at the start of make_puzzle()
+    def reset_stats(self):
+        self.stats = {
+            "nodes": 0,             #placements tried, first words included
+            "backtracks": 0,        #placements undone
+            "restarts": 0,          #searches started over from a new first word
+            "exhausted": 0,         #searches that ran out of placements to try
+            "seconds": 0.0,
+        }
+
+    #True once the node or time budget of the constructor is used up, or a Portfolio run is over
+    def over_budget(self, start):
+        if self.stopped():
+            return True
+        if self.max_nodes is not None and self.stats["nodes"] >= self.max_nodes:
+            return True
+        if self.timeout is not None and time.perf_counter() - start >= self.timeout:
+            return True
+        return False
+
+    #indexes of the words after the first, the ones sharing the fewest letters with the rest of the bank
+    #first and the longer word first among equals
+    def word_order(self):
+        sets = [set(word.upper()) for word in self.word_bank]
+        counts = {}
+        for letters in sets:
+            for c in letters:
+                counts[c] = counts.get(c, 0) + 1
+        score = [sum(counts[c] - 1 for c in letters) for letters in sets]
+        return sorted(range(1, len(self.word_bank)), key=lambda k: score[k])
 
     """
     *********************************************************************************************
@@ -310,40 +329,93 @@ class Crossword(Puzzle):
     *   Parameters: none
     *   Return Values: Boolean of whether the puzzle creation was successful
     *
-    *   Operation: Sets up the puzzle and word bank, then loops through attempting to validate words,
-    *   any that cannot be placed are appended to the skipped list, where they will get another
-    *   chance to be placed. If word placements fail, the algorithm recurses up to a set number
-    *   of times and returns true if a puzzle is created within these trys, returns false otherwise 
+    *   Operation: Places the first word, then runs search() (step 5 above). A search that backtracks
+    *   more than its limit starts over with a new first word and twice the limit, until every word
+    *   is placed, the max_nodes/timeout budget runs out or 20 searches were exhausted
     *
     *********************************************************************************************
     """
     def make_puzzle(self):
 
-        self.puzzle = np.zeros((self.puz_size, self.puz_size), dtype=np.int)
-        self.first_word(self.word_bank[0])
-        for i in range(1, len(self.word_bank)):
-            word = self.word_bank[i]
-            check = self.validate_word(word)
-            if check:
-                self.reserved.append(check)
-                for c in check:
-                    self.puzzle[c[0], c[1]] = c[2]
-            else:
-                self.skipped.append(word)
-        for word in self.skipped:
-            check = self.validate_word(word)
-            if check:
-                self.reserved.append(check)
-                for c in check:
-                    self.puzzle[c[0], c[1]] = c[2]
+        self.reset_stats()
+        start = time.perf_counter()
+        order = self.word_order()
+        limit = 64
+        while not self.over_budget(start) and self.stats["exhausted"] < 20:
+            self.clear()
+            self.first_word(self.word_bank[0])
+            self.stats["nodes"] += 1
+            result = self.search(order, limit, start)
+            if result:
+                self.stats["seconds"] = time.perf_counter() - start
+                return True
+            if result is False:
+                self.stats["exhausted"] += 1
+            self.stats["restarts"] += 1
+            limit *= 2
+
+        self.stats["seconds"] = time.perf_counter() - start
+        return False
+
+    """
+    *********************************************************************************************
+    *
+    *                               -- search() --
+    *
+    *   Purpose: Depth first search for placements of the words in order, from the first word
+    *   Parameters: order - word indexes from word_order()
+    *               limit - backtracks allowed before giving up
+    *               start - perf_counter() time make_puzzle() started, for the budget
+    *   Return Values: True once every word is placed, False if it ran out of placements to try,
+    *   None if it ran out of backtracks or budget
+    *
+    *   Operation: The stack holds one entry per placed word, [word index, its shuffled valid
+    *   placements, next one to try]. At a dead end the top placement is undone and the next one
+    *   of the same word placed, entries with none left are popped
+    *
+    *********************************************************************************************
+    """
+    def search(self, order, limit, start):
+
+        placed = [False] * len(self.word_bank)
+        stack = []
+        backtracks = 0
+
+        while len(stack) < len(order):
+            if self.over_budget(start):
+                return None
+
+            #the first word in order that can be placed now
+            for k in order:
+                if not placed[k]:
+                    options = self.placements(self.word_bank[k])
+                    if options:
+                        self.rng.shuffle(options)
+                        stack.append([k, options, 1])
+                        placed[k] = True
+                        self.place(self.spell(self.word_bank[k], options[0]))
+                        self.stats["nodes"] += 1
+                        break
+
+            #none of them, undo placements until one has another option
             else:
-                self.trys += 1
-                if self.trys > 200:
+                while stack:
+                    entry = stack[-1]
+                    self.undo()
+                    self.stats["backtracks"] += 1
+                    backtracks += 1
+                    if entry[2] < len(entry[1]):
+                        self.place(self.spell(self.word_bank[entry[0]], entry[1][entry[2]]))
+                        self.stats["nodes"] += 1
+                        entry[2] += 1
+                        break
+                    stack.pop()
+                    placed[entry[0]] = False
+                if not stack:
                     return False
-                else:
-                    self.reserved.clear()
-                    self.skipped.clear()
-                    self.make_puzzle()
+                if backtracks > limit:
+                    return None
+
         return True
 
     def __str__(self):
@@ -0,0 +1,296 @@
+"""
+****************************************************************************************************
+
+                            ----Dense Crossword Fill----
+
+****************************************************************************************************
+
+Purpose:
+    Fills an American style crossword, a grid where every open square belongs to an across word and a
+    down word, from a large dictionary. Unlike Crossword.py, which lays out a small bank of words that
+    never touch, the block pattern is given and the words are chosen to fit it.
+
+The Algorithm:
+    Every run of two or more open squares is a slot, and every slot has a domain, the packed bitset of
+    the dictionary words that still fit it (see WordIndex.py). Two slots crossing at a square constrain
+    each other: a word stays in one domain only if its letter at the square is still possible in the
+    other. propagate() keeps every crossing consistent this way (arc consistency, AC-3), so filling one
+    slot narrows its crossings, their crossings and so on with a few numpy operations per crossing.
+
+    search() fills the grid depth first. It always takes the open slot with the fewest words left, tries
+    its words best first (letters that are common at their positions leave the crossing slots the most
+    words, randomized a little with the puzzle's np_rng) and propagates each choice. A word is only used
+    once. When a domain empties, the changes since the choice are undone from a trail of the domains
+    they replaced and the next word is tried. The search stops at the max_nodes/timeout budget.
+
+Pattern:
+    A list of strings, one per row, with # for blocks, letters for squares given in advance and any
+    other character (. or ?) for open squares.
+
+Usage:
+    index = WordIndex(words)        build once and share, it takes a few seconds for 200k words
+    fill = CrosswordFill(pattern, index, seed = 3)
+    fill.answers                    [(row, col, horizontal, word), ...]
+
+"""
+
+import numpy as np
+import json
+import time
+from Puzzle import Puzzle
+from WordIndex import WordIndex
+
+
+class CrosswordFill(Puzzle):
+
+    def __init__(self, pattern = None, words = None, name = None, creator = None, subject = None,
+        seed = None, max_nodes = 20000, timeout = None):
+
+        super().__init__(name, creator, subject, seed)
+        self.index = words if isinstance(words, WordIndex) else WordIndex(words)
+        self.pattern = [row.upper() for row in pattern]
+        self.height = len(self.pattern)
+        self.width = len(self.pattern[0])
+        self.max_nodes = max_nodes      #words the search may try, None means no limit
+        self.timeout = timeout          #seconds the search may take, None means no limit
+        self.reset_stats()
+        self.answers = []
+        self.puz_json = None
+        #ascii values of the given letters, 0 on open squares and blocks, the whole fill once one is found
+        self.puzzle = np.array([[ord(ch) if ch.isalpha() else 0 for ch in row] for row in self.pattern],
+            dtype=np.int64)
+        self.make_slots()
+        self.solved = self.make_puzzle()
+        if self.solved:
+            self.puz_json = json.dumps(self.puzzle.tolist())
+
+    #clears the search counters, called at the start of make_puzzle()
+    def reset_stats(self):
+        self.stats = {
+            "nodes": 0,             #words tried
+            "backtracks": 0,        #words taken back
+            "revisions": 0,         #domains narrowed by propagate()
+            "seconds": 0.0,
+        }
+
+    #True once the node or time budget of the constructor is used up, or a Portfolio run is over
+    def over_budget(self, start):
+        if self.stopped():
+            return True
+        if self.max_nodes is not None and self.stats["nodes"] >= self.max_nodes:
+            return True
+        if self.timeout is not None and time.perf_counter() - start >= self.timeout:
+            return True
+        return False
+
+    """
+    *********************************************************************************************
+    *
+    *                               -- make_slots() --
+    *
+    *   Purpose: Finds the slots of the pattern and where they cross
+    *   Parameters: None
+    *   Return Values: None, sets
+    *       slots       list of (row, col, horizontal, length)
+    *       crossings   for every slot, list of (position, other slot, position in the other)
+    *
+    *   Operation: Scans the rows for across runs and the columns for down runs of open squares,
+    *   every square remembers the slot and position covering it in each direction
+    *
+    *********************************************************************************************
+    """
+    def make_slots(self):
+
+        self.slots = []
+        owner = {}          #(row, col, horizontal) -> (slot, position)
+        for horizontal in (True, False):
+            lines, length = (self.height, self.width) if horizontal else (self.width, self.height)
+            for line in range(lines):
+                run = 0
+                for k in range(length + 1):
+                    row, col = (line, k) if horizontal else (k, line)
+                    if k < length and self.pattern[row][col] != "#":
+                        run += 1
+                        continue
+                    if run >= 2:
+                        start = k - run
+                        slot = len(self.slots)
+                        self.slots.append((line, start, True, run) if horizontal else (start, line, False, run))
+                        for position in range(run):
+                            square = (line, start + position, True) if horizontal else (start + position, line, False)
+                            owner[square] = (slot, position)
+                    run = 0
+
+        self.crossings = [[] for _ in self.slots]
+        for (row, col, horizontal), (slot, position) in owner.items():
+            other = owner.get((row, col, not horizontal))
+            if other:
+                self.crossings[slot].append((position, other[0], other[1]))
+
+    #squares of a slot as (row, col)
+    def squares(self, slot):
+        row, col, horizontal, length = self.slots[slot]
+        if horizontal:
+            return [(row, col + k) for k in range(length)]
+        return [(row + k, col) for k in range(length)]
+
+    #best first score of every word of a length, the log frequencies of its letters at their positions
+    def scores(self, length):
+        codes = self.index.codes[length]
+        freq = np.stack([np.bincount(codes[:, k], minlength=26) for k in range(length)]) / len(codes)
+        logs = np.log(np.maximum(freq, 1e-9))
+        return logs[np.arange(length), codes].sum(axis=1)
+
+    """
+    *********************************************************************************************
+    *
+    *                               -- propagate() --
+    *
+    *   Purpose: Makes every crossing consistent after some domains changed
+    *   Parameters: queue - slots whose domain changed
+    *   Return Values: False if some domain became empty, True otherwise
+    *
+    *   Operation: For each changed slot and each slot crossing it, the other slot keeps only the
+    *   words whose letter at the crossing is one of the letters still possible in the changed
+    *   slot. The replaced domain goes on self.trail, a narrowed slot joins the queue
+    *
+    *********************************************************************************************
+    """
+    def propagate(self, queue):
+
+        index = self.index
+        queued = set(queue)
+        while queue:
+            slot = queue.pop()
+            queued.discard(slot)
+            length = self.slots[slot][3]
+            for position, other, at in self.crossings[slot]:
+                allowed = index.letters(self.domains[slot], length, position)
+                domain = self.domains[other]
+                narrowed = index.restrict(domain, self.slots[other][3], at, allowed)
+                if np.array_equal(narrowed, domain):
+                    continue
+                self.stats["revisions"] += 1
+                self.trail.append((other, domain))
+                self.domains[other] = narrowed
+                if not narrowed.any():
+                    return False
+                if other not in queued:
+                    queue.append(other)
+                    queued.add(other)
+        return True
+
+    #puts the domains back as they were when the trail had mark entries
+    def undo(self, mark):
+        while len(self.trail) > mark:
+            slot, domain = self.trail.pop()
+            self.domains[slot] = domain
+
+    """
+    *********************************************************************************************
+    *
+    *                               -- search() --
+    *
+    *   Purpose: Depth first fill of the open slots
+    *   Parameters: start - perf_counter() time make_puzzle() started, for the budget
+    *   Return Values: True once every slot has a word, False if no fill exists below this point,
+    *   None if the budget ran out
+    *
+    *   Operation: Takes the open slot with the fewest words left and tries them best first. A word
+    *   is assigned by making it the slot's whole domain and removing it from every other open
+    *   slot of the same length, then propagate() runs from all of the changed slots
+    *
+    *********************************************************************************************
+    """
+    def search(self, start):
+
+        open_slots = [s for s in range(len(self.slots)) if self.assigned[s] < 0]
+        if not open_slots:
+            return True
+        counts = [self.index.count(self.domains[s]) for s in open_slots]
+        slot = open_slots[int(np.argmin(counts))]
+        length = self.slots[slot][3]
+
+        ids = self.index.ids(self.domains[slot], length)
+        order = ids[np.argsort(-(self.score[length][ids] + self.np_rng.random(len(ids))))]
+        for word in order.tolist():
+            if self.over_budget(start):
+                return None
+            self.stats["nodes"] += 1
+            mark = len(self.trail)
+            byte, bit = word >> 3, np.uint8(1 << (word & 7))
+
+            self.trail.append((slot, self.domains[slot]))
+            chosen = np.zeros_like(self.domains[slot])
+            chosen[byte] = bit
+            self.domains[slot] = chosen
+            self.assigned[slot] = word
+            changed = [slot]
+            for other in open_slots:
+                if other != slot and self.slots[other][3] == length and self.domains[other][byte] & bit:
+                    self.trail.append((other, self.domains[other]))
+                    self.domains[other] = self.domains[other].copy()
+                    self.domains[other][byte] &= ~bit
+                    changed.append(other)
+
+            if self.propagate(changed) and all(self.domains[s].any() for s in changed):
+                result = self.search(start)
+                if result is not False:
+                    return result
+            self.undo(mark)
+            self.assigned[slot] = -1
+            self.stats["backtracks"] += 1
+
+        return False
+
+    """
+    *********************************************************************************************
+    *
+    *                               -- make_puzzle() --
+    *
+    *   Purpose: Fills the pattern
+    *   Parameters: None
+    *   Return Values: Boolean of whether a fill was found within the budget
+    *
+    *   Operation: Starts every slot with the words matching its given letters, propagates, then
+    *   searches. On success self.puzzle holds the ascii values of the letters (0 on blocks) and
+    *   self.answers the word of every slot, otherwise self.puzzle keeps the given letters
+    *
+    *********************************************************************************************
+    """
+    def make_puzzle(self):
+
+        self.reset_stats()
+        start = time.perf_counter()
+        self.score = {length: self.scores(length) for length in set(s[3] for s in self.slots)
+            if length in self.index.words}
+        self.domains = []
+        for slot in range(len(self.slots)):
+            given = "".join(self.pattern[row][col] for row, col in self.squares(slot))
+            self.domains.append(self.index.pattern(given))
+        self.assigned = [-1] * len(self.slots)
+        self.trail = []
+
+        solved = (all(domain.any() for domain in self.domains)
+            and self.propagate(list(range(len(self.slots)))) and self.search(start) is True)
+        self.stats["seconds"] = time.perf_counter() - start
+        if not solved:
+            return False
+
+        self.puzzle = np.zeros((self.height, self.width), dtype=np.int64)
+        self.answers = []
+        for slot, (row, col, horizontal, length) in enumerate(self.slots):
+            word = self.index.words[length][self.assigned[slot]]
+            self.answers.append((row, col, horizontal, word))
+            for (r, c), letter in zip(self.squares(slot), word):
+                self.puzzle[r, c] = ord(letter)
+        return True
+
+    def __str__(self):
+        output = ""
+        for row in range(self.height):
+            output += "\n"
+            for col in range(self.width):
+                square = self.puzzle[row, col]
+                output += (chr(square) if square > 0 else "#" if self.pattern[row][col] == "#" else ".") + " "
+        return output
@@ -0,0 +1,283 @@
+"""
+****************************************************************************************************
+
+                            ----Exact Cover (Dancing Links) Sudoku Solver----
+
+****************************************************************************************************
+
+Purpose:
+    Solves Sudoku boards and counts their solutions, mainly so that hide_numbers() can check that a
+    puzzle still has exactly one solution every time it hides another number.
+
+The Algorithm:
+    Sudoku is an exact cover problem. Every choice "number n in square (row, col)" is a row of a matrix
+    with 729 rows and 324 columns, and each row covers exactly four columns: the square is filled, the row
+    has n, the column has n and the box has n. A solution picks rows so that every column is covered
+    exactly once. Knuth's Algorithm X finds these by repeatedly choosing the column with the fewest rows,
+    trying each of them and backtracking.
+
+    Dancing Links keeps the matrix as circular doubly linked lists, so removing ("covering") a column
+    and putting it back ("uncovering") only relinks neighbours. The links are stored in flat Python
+    lists of node indexes rather than node objects. The full empty matrix is built once when the module
+    is imported and every solver copies it, so setting up a board only costs a few list copies and
+    covering the columns of its given numbers.
+
+    Larger boards (16 by 16, 25 by 25) work the same way with size^3 choices and size^2 * 4 columns, the
+    box size is taken from the shape of the board and their matrices are built the first time they are used.
+
+"""
+
+import numpy as np
+
+
+#the four constraint columns covered by placing number num (1 - size) at (row, col)
+def choice_columns(row, col, num, box = 3):
+    size = box * box
+    squares = size * size
+    b = (row // box) * box + col // box
+    d = num - 1
+    return (
+        1 + row * size + col,
+        1 + squares + row * size + d,
+        1 + squares * 2 + col * size + d,
+        1 + squares * 3 + b * size + d,
+    )
+
+
+"""
+*********************************************************************************************
+*
+*                               -- build_template() --
+*
+*   Purpose: Build the links of the empty matrix for one board size
+*   Parameters: box - box size, 3 for the normal 9 by 9 board
+*   Return Values: tuple of the link lists L, R, U, D, C, the column sizes S, and two lookups,
+*                  choice_of (node -> choice) and first_node (choice -> first of its 4 nodes)
+*
+*   Operation: Node 0 is the root, the next size^2 * 4 nodes are the column headers and the
+*   rest are 4 nodes for each of the size^3 choices, where a choice is
+*   (row * size + col) * size + num - 1
+*
+*********************************************************************************************
+"""
+def build_template(box = 3):
+
+    size = box * box
+    columns = size * size * 4
+    nodes = 1 + columns + size ** 3 * 4
+    L = list(range(nodes))
+    R = list(range(nodes))
+    U = list(range(nodes))
+    D = list(range(nodes))
+    C = list(range(nodes))
+    S = [0] * (columns + 1)
+    choice_of = [-1] * nodes
+    first_node = [0] * size ** 3
+
+    #header row
+    for c in range(columns + 1):
+        L[c] = c - 1 if c > 0 else columns
+        R[c] = c + 1 if c < columns else 0
+
+    node = columns + 1
+    for row in range(size):
+        for col in range(size):
+            for num in range(1, size + 1):
+                choice = (row * size + col) * size + num - 1
+                first_node[choice] = node
+                for k, c in enumerate(choice_columns(row, col, num, box)):
+                    n = node + k
+
+                    #link the node into its choice row
+                    L[n] = node + (k - 1) % 4
+                    R[n] = node + (k + 1) % 4
+
+                    #append the node to the bottom of its column
+                    C[n] = c
+                    U[n] = U[c]
+                    D[n] = c
+                    D[U[c]] = n
+                    U[c] = n
+                    S[c] += 1
+                    choice_of[n] = choice
+                node += 4
+
+    return L, R, U, D, C, S, choice_of, first_node
+
+
+TEMPLATES = {}
+
+
+#templates are only built the first time a board size is used
+def template(box):
+    if box not in TEMPLATES:
+        TEMPLATES[box] = build_template(box)
+    return TEMPLATES[box]
+
+
+template(3)
+
+
+class DancingLinks:
+
+    def __init__(self, puzzle, box = None):
+
+        grid = np.asarray(puzzle)
+        if box is None:
+            box = int(round(grid.shape[0] ** 0.5))
+        self.box = box
+        self.size = box * box
+        L, R, U, D, C, S, self.choice_of, first_node = template(box)
+        self.L = L[:]
+        self.R = R[:]
+        self.U = U[:]
+        self.D = D[:]
+        self.C = C
+        self.S = S[:]
+        self.valid = True       #False if the given numbers already break a rule
+        self.givens = []
+        self.partial = []       #nodes of the choices made by the search
+        self.solution = None
+        self.found = 0
+
+        #cover the columns of every given number, a column that is already covered means a conflict
+        covered = [False] * len(S)
+        for idx, num in enumerate(grid.reshape(-1).tolist()):
+            if not num:
+                continue
+            node = first_node[idx * self.size + num - 1]
+            self.givens.append(node)
+            for k in range(4):
+                c = C[node + k]
+                if covered[c]:
+                    self.valid = False
+                    return
+                covered[c] = True
+                self.cover(c)
+
+    def cover(self, c):
+        L, R, U, D, C, S = self.L, self.R, self.U, self.D, self.C, self.S
+        R[L[c]] = R[c]
+        L[R[c]] = L[c]
+        i = D[c]
+        while i != c:
+            j = R[i]
+            while j != i:
+                D[U[j]] = D[j]
+                U[D[j]] = U[j]
+                S[C[j]] -= 1
+                j = R[j]
+            i = D[i]
+
+    def uncover(self, c):
+        L, R, U, D, C, S = self.L, self.R, self.U, self.D, self.C, self.S
+        i = U[c]
+        while i != c:
+            j = L[i]
+            while j != i:
+                S[C[j]] += 1
+                D[U[j]] = j
+                U[D[j]] = j
+                j = L[j]
+            i = U[i]
+        R[L[c]] = c
+        L[R[c]] = c
+
+    """
+    *********************************************************************************************
+    *
+    *                               -- search() --
+    *
+    *   Purpose: Algorithm X over the linked matrix
+    *   Parameters: limit - stop once this many solutions have been found
+    *   Return Values: None, updates self.found and stores the first solution in self.solution
+    *
+    *   Operation: Chooses the uncovered column with the fewest rows (a column with none means the
+    *   current branch is dead), covers it and tries each of its rows, covering the other columns of
+    *   that row before recursing and uncovering them in reverse order afterwards. Recursion depth is
+    *   at most the number of empty squares
+    *
+    *********************************************************************************************
+    """
+    def search(self, limit):
+
+        L, R, D, C, S = self.L, self.R, self.D, self.C, self.S
+        partial = self.partial
+
+        #bound once here, as this loop is where nearly all of the solving time goes
+        cover, uncover = self.cover, self.uncover
+
+        def step():
+            c = R[0]
+            if c == 0:
+                self.found += 1
+                if self.solution is None:
+                    self.solution = partial[:]
+                return self.found >= limit
+
+            #choose the column with the fewest remaining rows
+            best, size = c, S[c]
+            while c and size > 1:
+                if S[c] < size:
+                    best, size = c, S[c]
+                c = R[c]
+            if size == 0:
+                return False
+
+            cover(best)
+            done = False
+            r = D[best]
+            while r != best:
+                partial.append(r)
+                j = R[r]
+                while j != r:
+                    cover(C[j])
+                    j = R[j]
+
+                done = step()
+
+                j = L[r]
+                while j != r:
+                    uncover(C[j])
+                    j = L[j]
+                partial.pop()
+                if done:
+                    break
+                r = D[r]
+            uncover(best)
+            return done
+
+        step()
+
+    #counts solutions, stopping early at limit (2 is enough to tell if a puzzle is unique)
+    def count(self, limit = 2):
+        if not self.valid:
+            return 0
+        self.found = 0
+        self.solution = None
+        self.search(limit)
+        return self.found
+
+    #returns one solution as a size by size array, or None if the board cannot be solved
+    def solve(self):
+        if self.count(1) == 0:
+            return None
+        size = self.size
+        grid = [0] * (size * size)
+        for node in self.givens + self.solution:
+            choice = self.choice_of[node]
+            grid[choice // size] = choice % size + 1
+        return np.array(grid, dtype=np.int64).reshape(size, size)
+
+
+#convenience wrappers
+def count_solutions(puzzle, limit = 2):
+    return DancingLinks(puzzle).count(limit)
+
+
+def is_unique(puzzle):
+    return DancingLinks(puzzle).count(2) == 1
+
+
+def solve(puzzle):
+    return DancingLinks(puzzle).solve()
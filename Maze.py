@@ -22,45 +22,75 @@
 *      Step 2: Create the actual starting path
 *      Letting the algorithm branch on its own might result in a maze-like structure with no way for the player to traverse the
 *      maze successfully, so a true path must be made. Using the max-steps specified, the starting_path() function will randomly
-*      select a starting point and then attempt to make the path. Since the directions of the 'steps' are determined randomly 
-*      each iteration, there is a possibility that the path could get stuck by coiling in on itelf or navigating to a corner,
-*      so each iteartion checks if there is a step available using check_steps(). The maze and path will reset if no steps are 
-*      available and then attempt the path again. Once a successful path has been made, a entry point and exit point will be visible
-*      on the outer walls of the maze
+*      select a starting point on the left side and then make the path, each iteration stepping in a random direction at the
+*      largest step size that still has one. Since the directions are chosen randomly the path can get stuck by coiling in on
+*      itself or running into a corner, in which case its last step is taken back while its points stay filled, so they are never
+*      tried again, and the path goes on from the point before it. Once the path reaches the right side, an entry point and an
+*      exit point will be visible on the outer walls of the maze
 *
 *      Step 3: Create the branches of the maze
-*      The branches are the misleading paths of the maze that do not lead to the exit point. They are created much in the same way
-*      as the starting path, using check_steps() to determine if a path is available and trying to step at the size of the max-step
-*      each iteration, decrementing the step size in hopes of finding a path. However, the branches try to go as far as they can until
-*      no further paths are available in order to make a complicated maze. Two sets of points are used to achieve a full maze, one of 
-*      source points where a new step can be taken from, and another of all remaining possible points a path could reach in the maze
-*      matrix. The goal of the branching method is to run until the set of remaining set of points is empty, but each time a succesful
-*      step is taken, one more source point will be added to the respective set wherefrom a new step can be taken. Steps will prefer
-*      using the last step of a successful branch as a source.
+*      The branches are the misleading paths of the maze that do not lead to the exit point. They step much in the same way as
+*      the starting path, at the largest step size that has a valid direction, but never go back, they try to go as far as they
+*      can until no further step is available in order to make a complicated maze. Every filled point is a source a new branch
+*      can start from, and a source that is picked without any step left is dropped. The branching runs until no source is left,
+*      and steps prefer using the last point of a successful step as their source so a branch keeps going.
+*
+*  Implementation:
+*      The maze is a uint8 numpy array. The main path and the branches step on a padded lattice of its points instead, a
+*      bytearray holding 1 for every open point where a point is a single index and a direction is a fixed offset added to it,
+*      with a ring of filled padding around it so a step never needs a bounds check. largest_step() returns the largest step
+*      size and its possible directions as a 4 bit mask with a few reads, and a step only records the direction every point was
+*      entered from, which paint() writes onto the maze array with a few numpy assignments once the path or the branches
+*      are done, so no lists of coordinates are built while the maze is made. moves() and check_steps() are not used while making
+*      the maze anymore, they are kept for compatibility and answer for a square of the finished or loaded maze array.
+*      The branch sources are a list of the filled points that drops a point once it is picked without an open neighbor, so
+*      picking a new source never scans the maze and the branches take time linear in its size.
+*
+*  Other Algorithms:
+*      Maze(algorithm = name) makes the maze with one of the generators of MazeGenerators.py instead ("dfs", "kruskal", "wilson"
+*      or "prim"), which never restart and run in close to linear time. The default (None or "branching") is the algorithm above.
+*      Every algorithm fills the same maze array, with the solution path marked with 2 and the other paths with 3.
 *       
 **************************************************************************************************************************************
 """
 
 import numpy as np
-import random as rand
 import json
 from Puzzle import Puzzle
+from MazeGenerators import ALGORITHMS, mark_solution
+from MazeAnalysis import analyze
+import MazeCodec
+
+
+#direction names in the order of their bits in a move mask (bit 0 = above ... bit 3 = left)
+DIRECTIONS = ("above", "right", "below", "left")
+
+#the directions set in every 4 bit move mask
+DIRS_OF = [tuple(d for d in range(4) if mask >> d & 1) for mask in range(16)]
+
 
 class Maze(Puzzle):
 
-    def __init__(self, name=None, creator=None, subject=None, height=None, width=None, steps=None):
-        super().__init__(name, creator, subject)
+    def __init__(self, name=None, creator=None, subject=None, height=None, width=None, steps=None, seed=None, algorithm=None):
+        super().__init__(name, creator, subject, seed)
 
         #initialized values are defaults
         self.width = 25
         self.height = 25
         self.MAX_STEPS = 2
-        self.starting_pos
-        self.last_pos
-        self.remaining = set()
-        self.sources = set()
-        self.maze
-        self.maze_json = None
+        self.algorithm = algorithm
+        self.starting_pos = None
+        self.last_pos = None
+        self.sources = []
+        self.stats = {}         #steps and backtracks of the main path
+        self.maze = None
+        self.grid = None        #flat view of maze
+        self.cells = None       #memoryview of grid, for fast reads of single squares
+        self.offsets = None     #index offset of one square in each direction
+        self.free = None        #padded point lattice of the branching algorithm, only kept while the maze is made
+        self.lattice_width = None
+        self.steps_to = None    #lattice index offset of one point in each direction
+        self.json_cache = None  #maze_json, made when it is first asked for
 
         # constructor logic that will handle instantiation errors
         #height and width must always be odd integers
@@ -79,32 +109,161 @@ class Maze(Puzzle):
                 steps = 4
             self.MAX_STEPS = steps
 
+        if algorithm not in (None, "branching") and algorithm not in ALGORITHMS:
+            raise ValueError("unknown maze algorithm %r, expected 'branching' or one of %r" % (algorithm, sorted(ALGORITHMS)))
+
         #makes a maze on instantiation
         self.create_maze()
-        self.maze_json = json.dumps(self.maze.tolist())
+
+    #the maze as a JSON list of lists, only built for clients that ask for it
+    @property
+    def maze_json(self):
+        if self.json_cache is None:
+            self.json_cache = json.dumps(self.maze.tolist())
+        return self.json_cache
         
     #setup function that makes a clear maze for further alteration
     def init_maze(self):
 
         #numpy setup of 2d array
-        puz = np.zeros((self.height, self.width), dtype=np.int)
+        puz = np.zeros((self.height, self.width), dtype=np.uint8)
 
         #makes the outer walls
-        for i in range(self.width):
-            puz[0, i] = 1
-            puz[self.height-1, i] = 1
-
-        for i in range(1, self.height-1):
-            puz[i, 0] = 1
-            puz[i, self.width-1] = 1
+        puz[0, :] = 1
+        puz[-1, :] = 1
+        puz[:, 0] = 1
+        puz[:, -1] = 1
 
         #makes the internal unreachable points, these will never be accessible by a branch or path
-        for i in range(1, self.height//2):
-            for j in range(1, self.width//2):
-                puz[i*2, j*2] = 1
+        puz[2:self.height - 1:2, 2:self.width - 1:2] = 1
 
         return puz
 
+    #stores a maze array along with the flat views used by moves() and the generators
+    def use_maze(self, maze):
+        self.maze = maze
+        self.json_cache = None
+        self.grid = maze.reshape(-1)
+        self.cells = memoryview(self.grid)
+        self.offsets = (-self.width, 1, self.width, -1)
+
+    #a memoryview cannot be pickled (the worker processes of Portfolio.py send puzzles back that way), so the flat
+    #views are left out and made again from the maze array
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["grid"] = state["cells"] = None
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        if self.maze is not None:
+            self.use_maze(self.maze)
+
+    """
+    *********************************************************************************************
+    *
+    *                               -- moves() --
+    *
+    *   Purpose: Find the directions a step can be taken in from a square, kept with check_steps()
+    *   for compatibility since the maze itself is made on the lattice
+    *   Parameters: idx - flat index of the square (row * width + col)
+    *               step_size - the size of the step to check
+    *   Return Values: 4 bit mask of the valid directions (see DIRECTIONS), 0 if there are none
+    *
+    *   Operation: A step of size n passes through the n points 2, 4 ... 2n squares away in a
+    *   direction, each of which has to be inside the maze and still open (0). The checks are
+    *   index arithmetic on the flat grid, so nothing is allocated
+    *
+    *********************************************************************************************
+    """
+    def moves(self, idx, step_size):
+
+        row, col = divmod(idx, self.width)
+        reach = step_size * 2
+        cells = self.cells
+        down = self.width * 2
+        mask = 0
+
+        if row > reach:
+            for point in range(idx - down, idx - down * step_size - 1, -down):
+                if cells[point]:
+                    break
+            else:
+                mask |= 1
+        if col + reach < self.width:
+            for point in range(idx + 2, idx + reach + 1, 2):
+                if cells[point]:
+                    break
+            else:
+                mask |= 2
+        if row + reach < self.height:
+            for point in range(idx + down, idx + down * step_size + 1, down):
+                if cells[point]:
+                    break
+            else:
+                mask |= 4
+        if col > reach:
+            for point in range(idx - 2, idx - reach - 1, -2):
+                if cells[point]:
+                    break
+            else:
+                mask |= 8
+        return mask
+
+    #sets up the padded point lattice the main path and the branches step on, returns it as a uint8 array
+    #free[q] is 1 while the point q is open, the ring of padding around the points is 0 like a filled point,
+    #so a step can never leave the maze and none of the stepping functions need bounds checks
+    def use_lattice(self):
+        padded = np.pad(self.maze[1::2, 1::2] == 0, 1).astype(np.uint8)
+        self.lattice_width = padded.shape[1]
+        self.free = bytearray(padded.tobytes())
+        self.steps_to = (-self.lattice_width, 1, self.lattice_width, -1)
+        return padded
+
+    #lattice index of the point at row, col of the maze, and back
+    def to_lattice(self, row, col):
+        return (row // 2 + 1) * self.lattice_width + col // 2 + 1
+
+    def from_lattice(self, q):
+        row, col = divmod(q, self.lattice_width)
+        return row * 2 - 1, col * 2 - 1
+
+    #largest step size with a valid direction from the point q, and its move mask, (0, 0) if the point is stuck
+    #the mask of 1 point steps takes four reads, each longer size only reads on in the directions still open
+    def largest_step(self, q):
+        free = self.free
+        width = self.lattice_width
+        mask = free[q - width] | free[q + 1] << 1 | free[q + width] << 2 | free[q - 1] << 3
+        if not mask:
+            return 0, 0
+        step_size = 1
+        while step_size < self.MAX_STEPS:
+            n = step_size + 1
+            longer = ((mask & 1 and free[q - width * n]) | (mask & 2 and free[q + n]) << 1
+                | (mask & 4 and free[q + width * n]) << 2 | (mask & 8 and free[q - n]) << 3)
+            if not longer:
+                break
+            mask = longer
+            step_size = n
+        return step_size, mask
+
+    #picks one direction of a move mask at random
+    def random_direction(self, mask):
+        dirs = DIRS_OF[mask]
+        if len(dirs) == 1:
+            return dirs[0]
+        return dirs[int(self.rng.random() * len(dirs))]
+
+    #writes value on every point of came (the direction it was stepped into from plus 1, 0 for the others) and on the
+    #square it was entered through, the whole lattice in a few numpy assignments
+    def paint(self, came, value):
+        came = np.frombuffer(came, dtype=np.uint8).reshape(-1, self.lattice_width)[1:-1, 1:-1]
+        self.maze[1::2, 1::2][came > 0] = value
+        self.maze[2::2, 1::2][came == 1] = value
+        self.maze[1::2, 0:-1:2][came == 2] = value
+        self.maze[0:-1:2, 1::2][came == 3] = value
+        self.maze[1::2, 2::2][came == 4] = value
+
     """
     *********************************************************************************************
     *
@@ -115,82 +274,64 @@ class Maze(Puzzle):
     *   Return Values: None
     *
     *   Operation: First selects a random starting point on the left side of the maze, then tries
-    *   to 'step' in a random direction based on the MAX_STEP value. Uses check_step() to determine
-    *   if this step is valid. If it is, sets value on the maze array to indicate the starting path.
-    *   If it is not valid, attempts a lower step size. If a lower step size fails, the path is stuck
-    *   and must be restarted, at which point the method resets the maze with init_maze() and tries 
-    *   again. Continues until a step reaches the right-most non-wall column of the maze.
+    *   to 'step' in a random direction based on the MAX_STEP value. Uses largest_step() to find
+    *   the largest step size with a valid direction and the directions it has. If even the
+    *   smallest step fails, the path is stuck and backtracks: the last step is taken off the undo
+    *   stack and its points stay filled, so they are never tried again, then the walk goes on from
+    *   the point before it. Since every point is entered at most once the path is found in time
+    *   linear in the size of the maze, without ever rebuilding it. Continues until a step reaches
+    *   the right-most non-wall column of the maze, then the path is painted on the maze with 2.
+    *   self.stats counts the steps taken and the steps taken back
     *
     *********************************************************************************************
     """
     def starting_path(self):
 
         #initialize an empty maze array
-        self.maze = self.init_maze()
-        step_size = self.MAX_STEPS      #first initialization of step_size var
+        self.use_maze(self.init_maze())
+        self.use_lattice()
+        self.stats = {"steps": 0, "backtracks": 0}
+        free = self.free
+        came = bytearray(len(free))
+        last_col = self.lattice_width - 2
 
         #chooses a random starting position on the left side of the maze and alters maze array accordingly
-        start = rand.randint(0, (self.height//2 - 1))*2 + 1    
-        self.maze[start, 0] = 2
-        self.maze[start, 1] = 2
+        start = self.rng.randint(0, (self.height//2 - 1))*2 + 1
+        self.grid[start * self.width:start * self.width + 2] = 2
         self.starting_pos = (start, 0)
-        current_pos = (start, 1)    #this variable is essentially the LCV
-
-        #continue until coordinate tuple is on the rightmost non-wall position
-        while current_pos[1] != self.width - 2:
-
-            #reset of vars on each iteration
-            path_available = False
-            step_size = self.MAX_STEPS
-
-            #tries every stepsize
-            while step_size > 0:
-
-                valid_dirs, dir_names = self.check_steps(current_pos, step_size)
-
-                #check_steps was successful, a step is possible
-                if valid_dirs:
-                    path_available = True
-                    break
-
-                #check_steps not successful, try a lower step size
-                step_size -= 1
-
-            #at least the smallest step exists
-            if path_available:
-
-                #choose a random direction for step
-                rand_index = rand.randint(0, len(valid_dirs) - 1)
-                rand_place = valid_dirs[rand_index]
-                rand_dir = dir_names[rand_index]
-
-                #alters the maze based on the chosen direction
-                if rand_dir == "above":
-                    for n in range(step_size * 2):
-                        self.maze[rand_place[-1][0] + n, rand_place[-1][1]] = 2
-                elif rand_dir == "right":
-                    for n in range(step_size * 2):
-                        self.maze[rand_place[-1][0], rand_place[-1][1] - n] = 2
-                elif rand_dir == "below":
-                    for n in range(step_size * 2):
-                        self.maze[rand_place[-1][0] - n, rand_place[-1][1]] = 2
-                elif rand_dir == "left":
-                    for n in range(step_size * 2):
-                        self.maze[rand_place[-1][0], rand_place[-1][1] + n] = 2
-
-                #saves last point filled
-                current_pos = rand_place[-1]
-
-            #no paths available, reset the maze
+        current = self.to_lattice(start, 1)     #lattice index of the path's end, essentially the LCV
+        free[current] = 0
+        undo = []           #(point, direction, step_size) of every step on the path, to take it back
+
+        #continue until the path is on the rightmost non-wall position
+        while current % self.lattice_width != last_col:
+
+            step_size, mask = self.largest_step(current)
+
+            #at least the smallest step exists, step in a random direction
+            if mask:
+                direction = self.random_direction(mask)
+                undo.append((current, direction, step_size))
+                off = self.steps_to[direction]
+                for _ in range(step_size):
+                    current += off
+                    free[current] = 0
+                    came[current] = direction + 1
+                self.stats["steps"] += 1
+
+            #no paths available, take back the last step, its points stay filled
             else:
-                current_pos = (start, 1)
-                self.maze = self.init_maze()
-                self.maze[start, 0] = 2
-                self.maze[start, 1] = 2
+                current, direction, step_size = undo.pop()
+                off = self.steps_to[direction]
+                for n in range(1, step_size + 1):
+                    came[current + off * n] = 0
+                self.stats["backtracks"] += 1
+
+        self.paint(came, 2)
 
         #saves last position to class and makes the exit
-        self.last_pos = current_pos
-        self.maze[current_pos[0], current_pos[1] + 1] = 2
+        self.last_pos = self.from_lattice(current)
+        self.grid[self.last_pos[0] * self.width + self.last_pos[1] + 1] = 2
 
     """
     *********************************************************************************************
@@ -204,120 +345,74 @@ class Maze(Puzzle):
     *   Operation: Similar to the function of the starting_path() function, but fills all remaining
     *   points of the maze with paths that begin from the actual path or from an existing branch, 
     *   will typically prefer sourcing from the end of the last step made in a branch, if possible.
-    *   Maintains two sets of points, remaining and sources, sources will grow as new branches are 
-    *   added (begins with the sources from the main path) and remaining will shrink as spaces are
-    *   filled in. The function's loop ends when all spaces are filled, and it will try smaller and
-    *   smaller step sizes on all possible sources until a valid position is found
+    *   Keeps the number of remaining (open) points and a list of sources, every filled point.
+    *   When the prefered point is stuck, a random source is picked and steps with the largest
+    *   size it has. A source without an open neighbor never gets one back, so when one is picked
+    *   it is swapped out of the list in O(1) and another is drawn: each filled point is dropped
+    *   at most once and the pick is still uniform over the sources that can step. The branches
+    *   are painted on the maze with 3 once they are all made
     *
     *********************************************************************************************
     """
     def make_branches(self):
 
-        step_size = self.MAX_STEPS
-        # pass through the matrix and determine if a position is open (remaining) or already filled (a source)
-        i, j = 1, 1
-        while i < self.height:
-            while j < self.width:
-                if self.maze[i, j] == 0:
-                    self.remaining.add((i, j))
+        # every point of the lattice is either open (remaining) or already filled (a source)
+        padded = self.use_lattice()
+        free = self.free
+        came = bytearray(len(free))
+        remaining = int(padded.sum())
+        filled = np.zeros(padded.shape, dtype=bool)
+        filled[1:-1, 1:-1] = padded[1:-1, 1:-1] == 0
+        self.sources = sources = np.flatnonzero(filled).tolist()
+
+        #the loop below runs once per step of every branch, so it works on locals and random_direction() is inlined
+        width = self.lattice_width
+        steps_to = self.steps_to
+        largest_step = self.largest_step
+        rand = self.rng.random
+
+        prefer = None   #var to hold the prefered source (the last point placed in a branch, makes a more difficult maze)
+
+        while remaining:
+
+            mask = 0
+
+            #flow for continuing a branch because the prefer var is set, a stuck prefered point is still the last
+            #source in the list and leaves it right away
+            if prefer is not None:
+                step_size, mask = largest_step(prefer)
+                source = prefer
+                if not mask:
+                    sources.pop()
+
+            #there was not a step from the prefered point, start from a random source instead
+            while not mask and sources:
+                pos = int(rand() * len(sources))
+                source = sources[pos]
+                if free[source - width] or free[source + 1] or free[source + width] or free[source - 1]:
+                    step_size, mask = largest_step(source)
                 else:
-                    self.sources.add((i,j))
-                j += 2
-            j = 1
-            i += 2
-       
-        prefer = None   #var to hold the prefered source (the last coordinate place in a branch, makes a more difficult maze)
-        removals = []   #cannot remove items of a set during iteration, they will be stored here when found and removed later   
-
-        while self.remaining:
-            
-            path_available = False
-            prefer_available = False
-
-            #flow for continiuing a branch because the prefer var is set
-            if prefer:
-
-                #tries lower and lower step sizes to find a possible step
-                while step_size > 0:
-
-                    #call to check_steps to see if a step is possible or if the source is 'stuck'
-                    valid_dirs, dir_names = self.check_steps(prefer, step_size)
-                    if valid_dirs:
-                        prefer_available = True
-                        break
-                    else:
-                        step_size -= 1
-
-            # the above code failed, there was not a step from the prefered point
-            if not prefer_available:
-
-                #remove that prefered point from sources for efficiency and reset step size for new try
-                if prefer:
-                    self.sources.remove(prefer)
-                step_size = self.MAX_STEPS
-                while step_size > 0:
-
-                    removals.clear()
-                    #now loop through sources set to find a new valid step source
-                    for s in self.sources:
-                        valid_dirs, dir_names = self.check_steps(s, step_size)
-
-                        #exit loop if a valid step is found
-                        if valid_dirs:
-                            path_available = True
-                            break
-
-                        #otherwise mark that point for removal if smallest step size is tried
-                        elif step_size == 1:
-                            removals.append(s)
-                    
-                    #remove dead sources
-                    for rem in removals:
-                        self.sources.remove(rem)
-
-                    #exit loop if a step exists
-                    if path_available:
-                        break
-
-                    #otherwise try a smaller step size
-                    else:
-                        step_size -= 1
-                
-            #one kind of path exists
-            if path_available or prefer_available:
-
-                #randomly choose one of the valid directions to travel
-                rand_index = rand.randint(0, len(valid_dirs) - 1)
-                rand_place = valid_dirs[rand_index]
-                rand_dir = dir_names[rand_index]
-
-                #alter the maze based on the direction
-                if rand_dir == "above":
-                    for n in range(step_size * 2):
-                        self.maze[rand_place[-1][0] + n, rand_place[-1][1]] = 3
-                elif rand_dir == "right":
-                    for n in range(step_size * 2):
-                        self.maze[rand_place[-1][0], rand_place[-1][1] - n] = 3
-                elif rand_dir == "below":
-                    for n in range(step_size * 2):
-                        self.maze[rand_place[-1][0] - n, rand_place[-1][1]] = 3
-                elif rand_dir == "left":
-                    for n in range(step_size * 2):
-                        self.maze[rand_place[-1][0], rand_place[-1][1] + n] = 3
-
-                #set the prefer point to the last point filled
-                prefer = rand_place[-1]
-
-                #add new branch points to sources and remove the points from remaining
-                for r in rand_place:
-                    self.remaining.remove(r)
-                    self.sources.add(r)
-                #reset step size
-                step_size = self.MAX_STEPS
-
-            #error condition (loop should end when condition checks for empty remaining, this check prevents infinite loop in error)
-            else:
-                break
+                    last = sources.pop()
+                    if pos < len(sources):
+                        sources[pos] = last
+            if not mask:
+                break       #error condition, prevents an infinite loop if points cannot be reached
+
+            #randomly choose one of the valid directions to travel, a single one needs no draw
+            dirs = DIRS_OF[mask]
+            direction = dirs[int(rand() * len(dirs))] if len(dirs) > 1 else dirs[0]
+            off = steps_to[direction]
+            point = source
+            for _ in range(step_size):
+                point += off
+                free[point] = 0
+                came[point] = direction + 1
+                sources.append(point)
+            remaining -= step_size
+            prefer = point
+
+        self.paint(came, 3)
+
     """
     *********************************************************************************************
     *
@@ -327,80 +422,83 @@ class Maze(Puzzle):
     *   Parameters: coord (Tuple representing the coordinate (i, j))
     *               step_size (the size of the step to check)
     *   Return Values: If successful --> valid_dirs, dir_names 
-    *                                   (list of ending coordinates, list of those direction's names)
+    *                                   (list of the step's points for every direction, list of those direction's names)
     *                  If failed --> False, False
     *
-    *   Operation: Determines all possible directions' coordinates mathematically, then checks
-    *   these coordinates against the maze to determine if they are out of bounds or collide with a
-    *   wall or an existing path. Then returns lists of valid coordinate endings and the directions
+    *   Operation: Coordinate version of moves(), the points of every valid direction are listed
+    *   in order with the step's end last
     *
     *********************************************************************************************
     """
     def check_steps(self, coord, step_size):
 
+        idx = coord[0] * self.width + coord[1]
+        mask = self.moves(idx, step_size)
+        if not mask:
+            return False, False
+
         valid_dirs = []
         dir_names = []
-        above = []
-        right = []
-        below = []
-        left = []
-
-        #create mathematical coordinates for all directions
-        for i in range(1, step_size + 1):
-            above.append((coord[0] - (2 * i), coord[1]))
-            right.append((coord[0], coord[1] + (2 * i)))
-            below.append((coord[0] + (2 * i), coord[1]))
-            left.append((coord[0], coord[1] - (2 * i)))
-
-        above_valid = True
-        right_valid = True
-        below_valid = True
-        left_valid = True
-
-        # check for out of bounds and collisions for all coordinates
-        for tup in above:
-            if tup[0] < 1 or self.maze[tup[0], tup[1]] != 0:
-                above_valid = False
-                break
-
-        for tup in right:
-            if tup[1] >= self.width or self.maze[tup[0], tup[1]] != 0:
-                right_valid = False
-                break
-
-        for tup in below:
-            if tup[0] >= self.height or self.maze[tup[0], tup[1]] != 0:
-                below_valid = False
-                break
-
-        for tup in left:
-            if tup[1] < 1 or self.maze[tup[0], tup[1]] != 0:
-                left_valid = False
-                break
-
-        #add valid direction data to their respective list
-        if above_valid:
-            valid_dirs.append(above)
-            dir_names.append("above")
-        if right_valid:
-            valid_dirs.append(right)
-            dir_names.append("right")
-        if below_valid:
-            valid_dirs.append(below)
-            dir_names.append("below")
-        if left_valid:
-            valid_dirs.append(left)
-            dir_names.append("left")
-
-        #return lists if they exist
-        if valid_dirs:
-            return valid_dirs, dir_names
-
-        #otherwise return 2 Falses
-        return False, False
+        for d in DIRS_OF[mask]:
+            off = self.offsets[d] * 2
+            valid_dirs.append([divmod(idx + off * n, self.width) for n in range(1, step_size + 1)])
+            dir_names.append(DIRECTIONS[d])
+        return valid_dirs, dir_names
+
+    #makes the maze with one of the generators of MazeGenerators.py, entry and exit are random points on the left and right side
+    def generate_with(self, algorithm):
+
+        self.use_maze(self.init_maze())
+        start = self.rng.randint(0, (self.height//2 - 1))*2 + 1
+        end = self.rng.randint(0, (self.height//2 - 1))*2 + 1
+        entry = start * self.width + 1
+        exit = end * self.width + self.width - 2
+
+        parent = ALGORITHMS[algorithm](self.cells, self.width, entry, self.rng)
+        mark_solution(self.cells, parent, entry, exit)
+        self.starting_pos = (start, 0)
+        self.last_pos = (end, self.width - 2)
+
+    #solution length, dead ends, junctions, branch depths and the distance map of the maze (see MazeAnalysis.py)
+    def analyze(self):
+        return analyze(self.maze)
+
+    #packs the maze into passage and solution bitsets, about 3 bits per point (see MazeCodec.py)
+    def to_bytes(self):
+        return MazeCodec.pack(self.maze)
+
+    #rebuilds a Maze from to_bytes() output
+    @classmethod
+    def from_bytes(cls, data):
+
+        array, entry, exit = MazeCodec.unpack(data)
+        #skips __init__(), which would make a maze only to throw it away, a loaded maze has no seed to make it again
+        maze = cls.__new__(cls)
+        maze.name = None
+        maze.creator = None
+        maze.subject = None
+        maze.seed = None
+        maze.rng = None
+        maze.np_rng = None
+        maze.height, maze.width = array.shape
+        maze.MAX_STEPS = 2
+        maze.algorithm = None
+        maze.starting_pos = (entry, 0)
+        maze.last_pos = (exit, maze.width - 2)
+        maze.sources = []
+        maze.stats = {}
+        maze.free = None
+        maze.lattice_width = None
+        maze.steps_to = None
+        maze.use_maze(array)
+        return maze
 
     #simplifies creation of the maze into one call
     def create_maze(self):
-        self.starting_path()
-        self.make_branches()
-    
\ No newline at end of file
+        if self.algorithm in (None, "branching"):
+            self.starting_path()
+            self.make_branches()
+            self.free = None
+            self.sources = []
+        else:
+            self.generate_with(self.algorithm)
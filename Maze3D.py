@@ -0,0 +1,108 @@
+"""
+****************************************************************************************************
+
+                            ----Multi-Level Mazes----
+
+****************************************************************************************************
+
+Purpose:
+    Mazes of several floors stacked on top of each other, joined by stairs. Made with the graph
+    algorithms of MazeGraph.py on a grid3d() graph, so they are perfect mazes like the flat ones and
+    cost the same per cell.
+
+Encoding:
+    maze        (levels, height, width) uint8, every floor drawn like a Maze array (1 fixed wall, 0 wall
+                between points, 2 solution, 3 passage)
+    stairs      (levels - 1, rows, cols) bool, True where the point (r, c) of a floor is joined to the
+                same point of the floor above
+    solution    list of the cells on the route from the entry to the exit, as (level, row, col) points
+
+    The entry is on the left side of the bottom floor and the exit on the right side of the top floor,
+    at random odd rows.
+
+"""
+
+import numpy as np
+from Puzzle import Puzzle
+import MazeGraph
+
+
+class Maze3D(Puzzle):
+
+    def __init__(self, name=None, creator=None, subject=None, levels=3, height=None, width=None,
+        algorithm="dfs", seed=None):
+
+        super().__init__(name, creator, subject, seed)
+        if algorithm not in MazeGraph.ALGORITHMS:
+            raise ValueError("unknown maze algorithm %r, expected one of %r" % (algorithm, sorted(MazeGraph.ALGORITHMS)))
+
+        #same sizes as Maze, odd and 25 by default
+        self.levels = max(1, levels)
+        self.width = 25
+        self.height = 25
+        if width:
+            if width % 2 == 0:
+                width += 1
+            self.width = width
+        if height:
+            if height % 2 == 0:
+                height += 1
+            self.height = height
+
+        self.algorithm = algorithm
+        self.graph = MazeGraph.grid3d(self.levels, (self.height - 1) // 2, (self.width - 1) // 2)
+        self.parent = None
+        self.solution = None
+        self.maze = None
+        self.stairs = None
+        self.create_maze()
+
+    def create_maze(self):
+
+        levels, rows, cols = self.graph.shape
+        start = self.rng.randint(0, rows - 1)
+        end = self.rng.randint(0, rows - 1)
+        entry = start * cols
+        exit = ((levels - 1) * rows + end) * cols + cols - 1
+        self.starting_pos = (0, start * 2 + 1, 0)
+        self.last_pos = (levels - 1, end * 2 + 1, self.width - 2)
+
+        self.parent = MazeGraph.ALGORITHMS[self.algorithm](self.graph, entry, self.rng)
+        path = MazeGraph.route(self.parent, exit)[::-1]
+        self.solution = [tuple(int(x) for x in np.unravel_index(cell, self.graph.shape)) for cell in path]
+        self.draw(np.array(path, dtype=np.int64))
+
+    #draws the floors and stairs of the tree in self.parent, then the solution path with 2
+    def draw(self, path):
+
+        levels, rows, cols = self.graph.shape
+        maze = np.zeros((levels, self.height, self.width), dtype=np.uint8)
+        maze[:, 0, :] = maze[:, -1, :] = 1
+        maze[:, :, 0] = maze[:, :, -1] = 1
+        maze[:, 2:self.height - 1:2, 2:self.width - 1:2] = 1
+        maze[:, 1::2, 1::2] = 3
+        stairs = np.zeros((max(levels - 1, 0), rows, cols), dtype=bool)
+
+        parent = np.array(self.parent, dtype=np.int64)
+        child = np.flatnonzero(parent != np.arange(len(parent)))
+        l, r, c = np.unravel_index(child, self.graph.shape)
+        pl, pr, pc = np.unravel_index(parent[child], self.graph.shape)
+        flat = l == pl
+        maze[l[flat], r[flat] + pr[flat] + 1, c[flat] + pc[flat] + 1] = 3
+        stairs[np.minimum(l, pl)[~flat], r[~flat], c[~flat]] = True
+
+        l, r, c = np.unravel_index(path, self.graph.shape)
+        maze[l, r * 2 + 1, c * 2 + 1] = 2
+        flat = l[1:] == l[:-1]
+        maze[l[1:][flat], r[1:][flat] + r[:-1][flat] + 1, c[1:][flat] + c[:-1][flat] + 1] = 2
+        maze[self.starting_pos] = 2
+        maze[self.last_pos[0], self.last_pos[1], -1] = 2
+
+        self.maze = maze
+        self.stairs = stairs
+
+    #steps from every point to the exit, (levels, rows, cols) int32, for hints
+    def distance_to_exit(self):
+        exit = np.ravel_multi_index(self.solution[-1], self.graph.shape)
+        dist = MazeGraph.tree_distances(self.parent, exit)
+        return dist.reshape(self.graph.shape)
@@ -0,0 +1,418 @@
+"""
+****************************************************************************************************
+
+                            ----Maze Solving and Analysis----
+
+****************************************************************************************************
+
+Purpose:
+    Measures a finished maze, so that its difficulty can be judged when it is made: the length and shape
+    of the shortest route, how many dead ends and junctions mislead the player and how deep the branches
+    off the route go. The distance map also gives hints, the next square of the way out from anywhere is
+    the neighbor one step closer to the exit.
+
+Operation:
+    Every square holding 2 or 3 is open, walls are 0 and 1 (see Maze.py). The maze is padded with a ring
+    of walls first so a neighbor index never wraps around to the other side of the maze (the entry and
+    exit squares sit on the border).
+
+    Most mazes are trees, one route between any two squares, and a depth first maze has a level for
+    almost every square of its long corridors, so a search a level at a time would take a numpy step per
+    square. A tree is measured along the walk around it that keeps a hand on the wall instead: the walk
+    is known from the move masks alone, it is put in order by pointer jumping in about log2 passes, and
+    a running sum of the moves down and back up along it is the distance map from where it starts. The
+    same order rotated serves any other source.
+
+    Mazes with loops are searched breadth first over the flat maze, a whole level at a time: the frontier
+    is an array of square indexes, its four neighbors are found by adding the direction offsets to it and
+    the open ones not yet reached become the next frontier.
+
+    The shortest route is not traced back square by square. A square is on it exactly when its distance
+    from the entry plus its distance to the exit equals the length of the route, so two distance maps
+    give the whole route as a mask, sorted into order by the distance from the entry. Only when a maze
+    with loops has several equally short routes is one of them followed back from the exit.
+
+    Nothing here depends on the solution marks, so it also works for mazes from MazeStream.
+
+"""
+
+import numpy as np
+
+
+#the entry and exit squares, the open squares of the left and right border
+def endpoints(maze):
+    maze = np.asarray(maze)
+    left = np.flatnonzero(maze[:, 0] >= 2)
+    right = np.flatnonzero(maze[:, -1] >= 2)
+    if not len(left) or not len(right):
+        raise ValueError("maze has no entry on the left side or no exit on the right side")
+    return (int(left[0]), 0), (int(right[0]), maze.shape[1] - 1)
+
+
+#flat open mask of the maze with a ring of walls around it, and the width of the padded maze
+def padded(maze):
+    maze = np.asarray(maze)
+    open_squares = np.zeros((maze.shape[0] + 2, maze.shape[1] + 2), dtype=bool)
+    open_squares[1:-1, 1:-1] = maze >= 2
+    return open_squares.reshape(-1), maze.shape[1] + 2
+
+
+#the four directions of the padded maze are numbered (above, right, below, left) like in Maze.py, a move mask has bit d
+#set when the neighbor in direction d is open. Per mask: the number of open directions, the number of open directions
+#below d, and the first open direction turning clockwise from d (d itself when it is the only one)
+OPEN_COUNT = np.array([bin(mask).count("1") for mask in range(16)], dtype=np.int32)
+OPEN_BELOW = np.array([[bin(mask & ((1 << d) - 1)).count("1") for d in range(4)] for mask in range(16)], dtype=np.int32)
+TURN = np.array([[next(((d + k) % 4 for k in range(1, 5) if mask >> (d + k) % 4 & 1), 0) for d in range(4)]
+    for mask in range(16)], dtype=np.int32)
+NTH_OPEN = np.array([[([d for d in range(4) if mask >> d & 1] + [0] * 4)[k] for k in range(4)] for mask in range(16)],
+    dtype=np.int32)
+
+#one in every 2 ** CUT_BITS moves of a tour starts a new stretch (see tour_order())
+CUT_BITS = 3
+
+
+"""
+*********************************************************************************************
+*
+*                               -- euler_tour() --
+*
+*   Purpose: The walk around a maze without loops that keeps a hand on the wall
+*   Parameters: maze - the maze array
+*   Return Values: pwidth, masks, first, head, twin, after
+*       pwidth      width of the padded maze
+*       masks       move mask of every padded square, 0 on walls
+*       first       the first move out of every padded square
+*       head        the padded square every move goes to
+*       twin        the same move taken the other way
+*       after       the move that follows every move on the walk
+*
+*   Operation: Every pair of neighboring open squares gives two moves, numbered square by
+*   square in the order of their directions. After arriving at a square the walk leaves by the
+*   first open direction clockwise from the one it came from, which only needs the move mask of
+*   that square, so the whole walk is known without following it. In a maze without loops this
+*   goes through every move of a connected part once, each passage down and back up again
+*
+*********************************************************************************************
+"""
+def euler_tour(maze):
+
+    free, pwidth = padded(maze)
+    offsets = np.array([-pwidth, 1, pwidth, -1], dtype=np.int32)
+    grid = free.reshape(-1, pwidth).view(np.uint8)
+    masks = np.zeros(grid.shape, dtype=np.uint8)
+    masks[1:-1, 1:-1] = (grid[:-2, 1:-1] | grid[1:-1, 2:] << 1 | grid[2:, 1:-1] << 2 | grid[1:-1, :-2] << 3) * grid[1:-1, 1:-1]
+    masks = masks.reshape(-1)
+
+    squares = np.flatnonzero(masks).astype(np.int32)
+    count = OPEN_COUNT[masks[squares]]
+    starts = np.cumsum(count, dtype=np.int32) - count
+    first = np.zeros(len(masks), dtype=np.int32)
+    first[squares] = starts
+
+    tail = np.repeat(squares, count)
+    nth = np.arange(len(tail), dtype=np.int32) - np.repeat(starts, count)
+    direction = NTH_OPEN[masks[tail], nth]
+    head = tail + offsets[direction]
+    back = (direction + 2) & 3
+    head_masks = masks[head]
+    twin = first[head] + OPEN_BELOW[head_masks, back]
+    after = first[head] + OPEN_BELOW[head_masks, TURN[head_masks, back]]
+
+    return pwidth, masks, first, head, twin, after
+
+
+"""
+*********************************************************************************************
+*
+*                               -- tour_order() --
+*
+*   Purpose: Position of every move on the walk of euler_tour(), counted from a start move
+*   Parameters: after - the following move of every move
+*               start - the move the walk starts with
+*   Return Values: int32 position of every move, -1 for moves the walk does not reach
+*
+*   Operation: List ranking. Following the walk one move at a time would be a Python loop
+*   over the whole maze, so the walk is cut into short stretches at a hashed sample of the
+*   moves, which spreads the cuts evenly however the maze is shaped. All stretches are followed
+*   at once, a numpy step per move of the longest one, recording the stretch and the offset in
+*   it of every move. The stretches are then ranked by pointer jumping: each pass adds the
+*   length still ahead of the stretch a pointer reaches and doubles how far the pointer goes,
+*   so about log2 of their number passes put every stretch at its position
+*
+*********************************************************************************************
+"""
+def tour_order(after, start):
+
+    ids = np.arange(len(after), dtype=np.uint32)
+    cut = (ids * np.uint32(2654435761)) >> np.uint32(32 - CUT_BITS) == 0
+    cut[start] = True
+    leaders = np.flatnonzero(cut)
+    stretches = len(leaders)
+
+    #stretch << 32 | offset in it of every move. Two more stretches of length 0 point to themselves, the end of
+    #the walk and the place of the moves in a part of the maze without any cut, which the walk never reaches
+    place = np.full(len(after), stretches + 1 << 32, dtype=np.int64)
+    place[leaders] = np.arange(stretches, dtype=np.int64) << 32
+    length = np.zeros(stretches + 2, dtype=np.int64)
+    ahead = np.full(stretches + 2, stretches, dtype=np.int64)
+    ahead[-1] = stretches + 1
+    move = after[leaders]
+    owner = np.arange(stretches, dtype=np.int64) << 32
+    steps = 1
+    while len(move):
+        going = ~cut[move]
+        if not going.all():
+            ended = owner[~going] >> 32
+            length[ended] = steps
+            ahead[ended] = place[move[~going]] >> 32
+            move, owner = move[going], owner[going]
+        place[move] = owner + steps
+        move = after[move]
+        steps += 1
+
+    #the walk is a loop, it is cut open before the start
+    first = place[start] >> 32
+    ahead[np.flatnonzero(ahead == first)[0]] = stretches
+
+    #the length still ahead and the pointer in one int64, so each pass is one gather
+    low = np.int64(0xFFFFFFFF)
+    packed = length << 32 | ahead
+    for _ in range(stretches.bit_length() + 1):
+        reached = packed[packed & low]
+        packed = (packed & ~low) + (reached & ~low) | reached & low
+
+    stretch = place >> 32
+    position = (packed[first] >> 32) - (packed[stretch] >> 32) + (place & low)
+    return np.where((packed & low)[stretch] == stretches, position, -1).astype(np.int32)
+
+
+"""
+*********************************************************************************************
+*
+*                               -- tree_distances() --
+*
+*   Purpose: Distance maps of a maze without loops from every one of several sources
+*   Parameters: maze - the maze array
+*               sources - list of (row, col) open squares
+*   Return Values: list of int32 arrays the shape of the maze, -1 on walls and unreachable squares
+*
+*   Operation: The walk of euler_tour() is put in order once with tour_order(). Started from a
+*   source's own first move, the walk goes down every passage before it comes back up it, so a
+*   running sum of +1 for every move down and -1 for every move up is the distance of the
+*   square a move down reaches. Another source is the same walk started elsewhere, the order is
+*   only rotated, so one ordering serves all of them (a source in another part of the maze
+*   orders that part from itself)
+*
+*********************************************************************************************
+"""
+def tree_distances(maze, sources):
+
+    maze = np.asarray(maze)
+    height, width = maze.shape
+    pwidth, masks, first, head, twin, after = euler_tour(maze)
+    maps = []
+    position = None
+
+    for row, col in sources:
+        square = (row + 1) * pwidth + col + 1
+        dist = np.full(len(first), -1, dtype=np.int32)
+        dist[square] = 0
+        start = first[square]
+        if not masks[square]:
+            maps.append(dist.reshape(height + 2, width + 2)[1:-1, 1:-1])
+            continue
+        if position is None or position[start] < 0:
+            position = tour_order(after, start)
+            moves = np.flatnonzero(position >= 0).astype(np.int32)
+            order = np.empty(len(moves), dtype=np.int32)
+            order[position[moves]] = moves
+            twin_position = position[twin[order]]
+        #the walk started from the source, a move is down when its twin comes later
+        shift = position[start]
+        rotated = np.roll(order, -shift)
+        later = np.roll(twin_position, -shift) - shift
+        later[later < 0] += len(order)
+        down = np.arange(len(order), dtype=np.int32) < later
+        steps = np.cumsum(np.where(down, 1, -1), dtype=np.int32)
+        dist[head[rotated[down]]] = steps[down]
+        dist[square] = 0
+        maps.append(dist.reshape(height + 2, width + 2)[1:-1, 1:-1])
+
+    return maps
+
+
+"""
+*********************************************************************************************
+*
+*                               -- distance_map() --
+*
+*   Purpose: Number of steps from the nearest source to every square
+*   Parameters: maze - the maze array
+*               sources - list of (row, col) squares, or a boolean mask the shape of the maze
+*   Return Values: int32 array the shape of the maze, -1 on walls and unreachable squares
+*
+*   Operation: A single open source in a maze without loops is measured along the walk of
+*   tree_distances(), whose cost does not grow with the number of levels. Otherwise breadth
+*   first search a level at a time with numpy frontier arrays (see above). Squares reached
+*   twice in the same level (only possible in mazes with loops) are kept once by writing each
+*   candidate's position into a scratch array and keeping the last writer
+*
+*********************************************************************************************
+"""
+def distance_map(maze, sources):
+
+    maze = np.asarray(maze)
+    loops = has_loops(maze)
+    single = not isinstance(sources, np.ndarray) or sources.dtype != bool
+    if single and len(sources) == 1 and not loops and maze[tuple(sources[0])] >= 2:
+        return tree_distances(maze, sources)[0]
+
+    height, width = maze.shape
+    free, pwidth = padded(maze)     #open squares not reached yet
+    dist = np.full(len(free), -1, dtype=np.int32)
+    offsets = np.array([-pwidth, 1, pwidth, -1], dtype=np.int32)
+    slot = None
+    if loops:
+        slot = np.zeros(len(free), dtype=np.int32)
+
+    if isinstance(sources, np.ndarray) and sources.dtype == bool:
+        rows, cols = np.nonzero(sources)
+    else:
+        rows, cols = np.array(sources, dtype=np.int64).reshape(-1, 2).T
+    frontier = ((rows + 1) * pwidth + cols + 1).astype(np.int32)
+    free[frontier] = False
+    dist[frontier] = 0
+
+    level = 0
+    while len(frontier):
+        level += 1
+        nxt = (frontier[:, None] + offsets).reshape(-1)
+        nxt = nxt[free[nxt]]
+        if slot is not None:
+            order = np.arange(len(nxt), dtype=np.int32)
+            slot[nxt] = order
+            nxt = nxt[slot[nxt] == order]
+        free[nxt] = False
+        dist[nxt] = level
+        frontier = nxt
+
+    return dist.reshape(height + 2, width + 2)[1:-1, 1:-1]
+
+
+#True if some open squares are joined by more than one route (the maze is not a tree)
+def has_loops(maze):
+    open_squares = np.asarray(maze) >= 2
+    joins = np.count_nonzero(open_squares[1:, :] & open_squares[:-1, :])
+    joins += np.count_nonzero(open_squares[:, 1:] & open_squares[:, :-1])
+    return joins >= np.count_nonzero(open_squares)
+
+
+#squares of the shortest route from entry to exit in order, as an (n, 2) array of (row, col)
+def shortest_path(maze, entry = None, exit = None, from_entry = None, to_exit = None):
+
+    if entry is None or exit is None:
+        entry, exit = endpoints(maze)
+    if from_entry is None:
+        from_entry = distance_map(maze, [entry])
+    if to_exit is None:
+        to_exit = distance_map(maze, [exit])
+    length = from_entry[exit]
+    if length < 0:
+        return np.zeros((0, 2), dtype=np.int64)
+
+    on_path = (from_entry >= 0) & (from_entry + to_exit == length)
+    rows, cols = np.nonzero(on_path)
+    if len(rows) == length + 1:
+        order = np.argsort(from_entry[rows, cols], kind="stable")
+        return np.stack([rows[order], cols[order]], axis=1)
+
+    #several routes are equally short (a maze with loops), follow one of them back from the exit
+    height, width = on_path.shape
+    path = [exit]
+    row, col = exit
+    for d in range(length - 1, -1, -1):
+        for r, c in ((row - 1, col), (row, col + 1), (row + 1, col), (row, col - 1)):
+            if 0 <= r < height and 0 <= c < width and on_path[r, c] and from_entry[r, c] == d:
+                row, col = r, c
+                break
+        path.append((row, col))
+    return np.array(path[::-1], dtype=np.int64)
+
+
+#number of open neighbors of every open square (0 on walls)
+def degrees(maze):
+    open_squares, pwidth = padded(maze)
+    grid = open_squares.reshape(-1, pwidth)
+    count = (grid[:-2, 1:-1].astype(np.int8) + grid[2:, 1:-1] + grid[1:-1, :-2] + grid[1:-1, 2:])
+    return np.where(grid[1:-1, 1:-1], count, 0)
+
+
+"""
+*********************************************************************************************
+*
+*                               -- analyze() --
+*
+*   Purpose: Summary of a maze for grading its difficulty
+*   Parameters: maze - the maze array
+*   Return Values: dict of
+*       entry, exit         (row, col) of the openings on the left and right side
+*       solution_length     squares on the shortest route, both openings included
+*       tortuosity          solution_length over the straight distance between the openings
+*                           (rows apart + columns apart + 1), 1.0 for a straight corridor
+*       dead_ends           open squares with a single open neighbor (the openings not counted)
+*       junctions           open squares with 3 or 4 open neighbors
+*       junctions_on_path   junctions along the route, the decisions the player has to make
+*       branch_depths       np.bincount of how far every dead end is from the route
+*       mean_branch_depth   average of the above, 0.0 without dead ends
+*       distance_to_exit    the distance map from the exit, for hints
+*       path                the route, as returned by shortest_path()
+*
+*   Operation: Distance maps from the entry and from the exit and one count of open neighbors,
+*   all of them whole array operations. In a maze without loops both maps come from the one walk
+*   of tree_distances(), and a square's distance from the route is half of how much longer than
+*   the route the way from the entry through it to the exit is. A maze with loops takes a third
+*   breadth first search from the whole route instead
+*
+*********************************************************************************************
+"""
+def analyze(maze):
+
+    maze = np.asarray(maze)
+    entry, exit = endpoints(maze)
+    loops = has_loops(maze)
+    if loops:
+        from_entry = distance_map(maze, [entry])
+        to_exit = distance_map(maze, [exit])
+    else:
+        from_entry, to_exit = tree_distances(maze, [entry, exit])
+    path = shortest_path(maze, entry, exit, from_entry, to_exit)
+
+    degree = degrees(maze)
+    ends = degree == 1
+    ends[entry] = ends[exit] = False
+    junctions = degree >= 3
+
+    on_path = np.zeros(maze.shape, dtype=bool)
+    on_path[path[:, 0], path[:, 1]] = True
+    if not len(path):
+        depth = np.full(maze.shape, -1)
+    elif loops:
+        depth = distance_map(maze, on_path)
+    else:
+        depth = np.where(from_entry >= 0, (from_entry + to_exit - (len(path) - 1)) // 2, -1)
+    depths = depth[ends & (depth >= 0)]
+
+    straight = abs(exit[0] - entry[0]) + abs(exit[1] - entry[1]) + 1
+    return {
+        "entry": entry,
+        "exit": exit,
+        "solution_length": len(path),
+        "tortuosity": len(path) / straight,
+        "dead_ends": int(ends.sum()),
+        "junctions": int(junctions.sum()),
+        "junctions_on_path": int(junctions[on_path].sum()),
+        "branch_depths": np.bincount(depths),
+        "mean_branch_depth": float(depths.mean()) if len(depths) else 0.0,
+        "distance_to_exit": to_exit,
+        "path": path,
+    }
@@ -0,0 +1,86 @@
+"""
+****************************************************************************************************
+
+                            ----Compact Maze Encoding----
+
+****************************************************************************************************
+
+Purpose:
+    Stores a maze in about 3 bits per point instead of the one square per byte of the array (and the
+    several characters per square of maze_json). Most of a maze array is fixed by the lattice of
+    init_maze(): the border and the squares between 4 points are always walls and every point is always
+    open, so only the squares between two neighboring points carry information.
+
+Format:
+    header          20 bytes    b"MAZE", then height, width, entry row and exit row as little endian
+                                uint32
+    horizontal      passages between every point and the point to its right, np.packbits order
+    vertical        passages between every point and the point below it
+    solution        points on the solution path (2)
+
+    Every bitset starts on a new byte. A passage is part of the solution exactly when both of its points
+    are, since a maze has only one route between two points, so the passages need no solution bits of
+    their own. A 501 by 501 maze takes 23 kB, against 251 kB for the array and 754 kB of JSON.
+
+"""
+
+import struct
+import numpy as np
+from MazeAnalysis import endpoints
+
+
+MAGIC = b"MAZE"
+HEADER = struct.Struct("<4sIIII")
+
+
+#the three bitsets of a maze array, horizontal and vertical passages and solution points
+def bitsets(maze):
+    maze = np.asarray(maze)
+    passable = maze >= 2
+    return passable[1:-1:2, 2:-1:2], passable[2:-1:2, 1:-1:2], maze[1:-1:2, 1:-1:2] == 2
+
+
+#maze array -> bytes
+def pack(maze):
+    maze = np.asarray(maze)
+    height, width = maze.shape
+    (entry, _), (exit, _) = endpoints(maze)
+    parts = [HEADER.pack(MAGIC, height, width, entry, exit)]
+    for bits in bitsets(maze):
+        parts.append(np.packbits(bits).tobytes())
+    return b"".join(parts)
+
+
+#bytes -> (maze array (uint8), entry row, exit row)
+def unpack(data):
+
+    magic, height, width, entry, exit = HEADER.unpack_from(data)
+    if magic != MAGIC:
+        raise ValueError("not a packed maze")
+    rows, cols = (height - 1) // 2, (width - 1) // 2
+    buffer = np.frombuffer(data, dtype=np.uint8)
+
+    #the three bitsets one after another, each padded to whole bytes
+    shapes = ((rows, cols - 1), (rows - 1, cols), (rows, cols))
+    sets = []
+    offset = HEADER.size
+    for shape in shapes:
+        count = shape[0] * shape[1]
+        nbytes = (count + 7) // 8
+        if offset + nbytes > len(buffer):
+            raise ValueError("packed maze is truncated")
+        sets.append(np.unpackbits(buffer[offset:offset + nbytes], count=count).astype(bool).reshape(shape))
+        offset += nbytes
+    horizontal, vertical, solution = sets
+
+    #the fixed lattice of init_maze(), then the points and the open passages
+    maze = np.zeros((height, width), dtype=np.uint8)
+    maze[0, :] = maze[-1, :] = 1
+    maze[:, 0] = maze[:, -1] = 1
+    maze[2:height - 1:2, 2:width - 1:2] = 1
+    maze[1:-1:2, 1:-1:2] = np.where(solution, 2, 3)
+    maze[1:-1:2, 2:-1:2] = np.where(horizontal, np.where(solution[:, :-1] & solution[:, 1:], 2, 3), 0)
+    maze[2:-1:2, 1:-1:2] = np.where(vertical, np.where(solution[:-1, :] & solution[1:, :], 2, 3), 0)
+    maze[entry, 0] = 2
+    maze[exit, -1] = 2
+    return maze, entry, exit
@@ -0,0 +1,102 @@
+"""
+****************************************************************************************************
+
+                            ----Maze Generation Algorithms----
+
+****************************************************************************************************
+
+Purpose:
+    Alternatives to the branching algorithm of Maze.py, selected with Maze(algorithm = name). Every
+    algorithm makes a "perfect" maze (exactly one route between any two points) in close to linear time,
+    with no restarts. The algorithms themselves work on cell graphs (MazeGraph.py), this module is the
+    adapter between them and the rectangular maze array.
+
+Interface:
+    A generator is called as generator(grid, width, root, rng), where grid is the flat memoryview of a
+    fresh maze from init_maze() (Maze.cells), root is the flat index of the entry point (row * width + 1)
+    and rng is the puzzle's random.Random. It carves every point of the maze with 3 and returns a parent list, giving
+    for every point the neighboring point one step closer to root. mark_solution() then follows the
+    parents back from the exit to draw the solution path with 2, so the maze uses the same encoding as
+    the branching algorithm (1 fixed wall, 0 wall between points, 2 solution, 3 branch).
+
+    Points sit on odd rows and columns and are the cells of a MazeGraph.grid(). The tree the graph
+    algorithm returns is drawn with two numpy writes, the points and the squares between every point
+    and its parent, which is (a + b) // 2.
+
+Algorithms:
+    dfs         iterative randomized depth first search, long winding corridors and few dead ends
+    kruskal     random walls are removed if they join two separate parts (union-find), many short dead ends
+    wilson      loop-erased random walks, every perfect maze is equally likely
+    prim        grows from the entry by random frontier walls, many short dead ends near the entry
+
+"""
+
+import numpy as np
+import MazeGraph
+
+
+GRAPHS = {}     #grid graphs by (rows, cols), reused by mazes and tiles of the same size
+
+
+#the graph of the points of a rows by cols maze
+def point_graph(rows, cols):
+    key = (rows, cols)
+    if key not in GRAPHS:
+        if len(GRAPHS) >= 8:
+            GRAPHS.clear()
+        GRAPHS[key] = MazeGraph.grid(rows, cols)
+    return GRAPHS[key]
+
+
+#runs a MazeGraph algorithm on the points of a flat maze, draws the tree with 3 and returns its parents as squares
+def generate(algorithm, grid, width, root, rng):
+
+    cells = np.frombuffer(grid, dtype=np.uint8)
+    rows, cols = (len(cells) // width - 1) // 2, (width - 1) // 2
+    squares = ((2 * np.arange(rows) + 1)[:, None] * width + 2 * np.arange(cols) + 1).reshape(-1)
+    point = (root // width - 1) // 2 * cols + (root % width - 1) // 2
+
+    parent = np.array(algorithm(point_graph(rows, cols), point, rng), dtype=np.int64)
+    child = np.flatnonzero(parent >= 0)
+    cells[squares[child]] = 3
+    cells[(squares[child] + squares[parent[child]]) // 2] = 3
+
+    square_parent = np.full(len(cells), -1, dtype=np.int64)
+    square_parent[squares[child]] = squares[parent[child]]
+    return square_parent.tolist()
+
+
+def dfs(grid, width, root, rng):
+    return generate(MazeGraph.dfs, grid, width, root, rng)
+
+
+def kruskal(grid, width, root, rng):
+    return generate(MazeGraph.kruskal, grid, width, root, rng)
+
+
+def wilson(grid, width, root, rng):
+    return generate(MazeGraph.wilson, grid, width, root, rng)
+
+
+def prim(grid, width, root, rng):
+    return generate(MazeGraph.prim, grid, width, root, rng)
+
+
+#draws the solution path with 2 by following the parents from the exit point back to the entry point
+def mark_solution(grid, parent, entry, exit):
+
+    point = exit
+    while point != entry:
+        nxt = parent[point]
+        grid[point] = grid[(point + nxt) // 2] = 2
+        point = nxt
+    grid[entry] = grid[entry - 1] = 2
+    grid[exit + 1] = 2
+
+
+ALGORITHMS = {
+    "dfs": dfs,
+    "kruskal": kruskal,
+    "wilson": wilson,
+    "prim": prim,
+}
@@ -0,0 +1,321 @@
+"""
+****************************************************************************************************
+
+                            ----Maze Cell Graphs----
+
+****************************************************************************************************
+
+Purpose:
+    The shape of a maze, kept apart from how it is drawn. A maze is a spanning tree of a graph whose
+    nodes are the cells (the points of Maze.py) and whose edges are the walls that may be opened. The
+    generators and the solver only ever see this graph, so a new shape of maze (more dimensions, other
+    cell shapes) is just a new graph builder, and every algorithm works on it unchanged. The rectangular
+    Maze is one such graph plus the drawing into its array (see MazeGenerators.py).
+
+Operation:
+    The graph is stored in CSR form, two integer arrays: the neighbors of cell v are
+    indices[indptr[v]:indptr[v + 1]]. Builders make the edge lists with numpy and sort them into CSR in
+    one pass. The generators walk the graph through Python lists of the same arrays (a numpy scalar
+    read is several times slower than a list read), and return the tree as a parent list, parent[v]
+    being the next cell on the way to the root (the root is its own parent, -1 = not in the maze).
+    Random orders (kruskal's edges, wilson's starting cells) are one numpy permutation seeded from rng,
+    and wilson's walk picks every neighbor with a single getrandbits() from a padded table (slots()).
+
+Algorithms:
+    dfs         iterative randomized depth first search
+    kruskal     random edges in random order joining separate trees (union-find)
+    wilson      loop-erased random walks, every spanning tree is equally likely
+    prim        grows from the root through random frontier edges
+
+Builders:
+    grid(rows, cols)                rectangular, 4 neighbors
+    grid3d(levels, rows, cols)      stacked rectangular levels, 6 neighbors (stairs up and down)
+
+"""
+
+import numpy as np
+
+
+class CellGraph:
+
+    def __init__(self, indptr, indices, shape = None):
+        self.indptr = np.asarray(indptr, dtype=np.int64)
+        self.indices = np.asarray(indices, dtype=np.int64)
+        self.size = len(self.indptr) - 1
+        self.shape = shape          #shape of the cells for graphs built from grids, e.g. (rows, cols)
+        self.lists = None
+        self.padded = None
+
+    #symmetric CSR graph of size cells from the edge arrays a[k] - b[k]
+    @classmethod
+    def from_edges(cls, size, a, b, shape = None):
+        tails = np.concatenate([a, b])
+        heads = np.concatenate([b, a])
+        order = np.lexsort((heads, tails))
+        indptr = np.zeros(size + 1, dtype=np.int64)
+        np.cumsum(np.bincount(tails, minlength=size), out=indptr[1:])
+        return cls(indptr, heads[order], shape)
+
+    #(indptr, indices) as Python lists for the generators' loops, made once per graph
+    def as_lists(self):
+        if self.lists is None:
+            self.lists = (self.indptr.tolist(), self.indices.tolist())
+        return self.lists
+
+    #neighbors of every cell padded with -1 to 2 ** bits slots, as (bits, list), cell v's slots start at v << bits
+    #so a random walk picks a neighbor with one getrandbits(bits), drawing again on a -1, made once per graph
+    def slots(self):
+        if self.padded is None:
+            degrees = self.degrees()
+            bits = max(int(degrees.max(initial=1)) - 1, 0).bit_length()
+            rows = np.repeat(np.arange(self.size), degrees)
+            table = np.full((self.size, 1 << bits), -1, dtype=np.int64)
+            table[rows, np.arange(len(self.indices)) - self.indptr[rows]] = self.indices
+            self.padded = (bits, table.reshape(-1).tolist())
+        return self.padded
+
+    def neighbors(self, v):
+        return self.indices[self.indptr[v]:self.indptr[v + 1]]
+
+    def degrees(self):
+        return np.diff(self.indptr)
+
+    #every edge once, as arrays a, b with a < b
+    def edges(self):
+        tails = np.repeat(np.arange(self.size), self.degrees())
+        keep = tails < self.indices
+        return tails[keep], self.indices[keep]
+
+
+#rectangular grid of rows by cols cells, cell (r, c) is r * cols + c
+def grid(rows, cols):
+    ids = np.arange(rows * cols).reshape(rows, cols)
+    a = np.concatenate([ids[:, :-1].reshape(-1), ids[:-1, :].reshape(-1)])
+    b = np.concatenate([ids[:, 1:].reshape(-1), ids[1:, :].reshape(-1)])
+    return CellGraph.from_edges(rows * cols, a, b, (rows, cols))
+
+
+#levels of rows by cols cells on top of each other, cell (l, r, c) is (l * rows + r) * cols + c
+def grid3d(levels, rows, cols):
+    ids = np.arange(levels * rows * cols).reshape(levels, rows, cols)
+    a = np.concatenate([ids[:, :, :-1].reshape(-1), ids[:, :-1, :].reshape(-1), ids[:-1].reshape(-1)])
+    b = np.concatenate([ids[:, :, 1:].reshape(-1), ids[:, 1:, :].reshape(-1), ids[1:].reshape(-1)])
+    return CellGraph.from_edges(levels * rows * cols, a, b, (levels, rows, cols))
+
+
+#iterative randomized depth first search with an explicit stack
+def dfs(graph, root, rng):
+
+    indptr, indices = graph.as_lists()
+    parent = [-1] * graph.size
+    parent[root] = root
+    stack = [root]
+
+    while stack:
+        v = stack[-1]
+        options = [u for u in indices[indptr[v]:indptr[v + 1]] if parent[u] < 0]
+        if not options:
+            stack.pop()
+            continue
+        u = options[int(rng.random() * len(options))]
+        parent[u] = v
+        stack.append(u)
+
+    return parent
+
+
+#makes v the root of its tree in a parent list and hangs it from to (v itself keeps it a root), reversing the links
+#on the way from v to the old root
+def hang(parent, v, to):
+    while True:
+        up = parent[v]
+        parent[v] = to
+        if up == v:
+            return
+        to, v = v, up
+
+
+#randomized Kruskal, edges in random order join the trees of their two cells (union-find by size with path halving)
+#the parent list is kept oriented while the trees are joined: the smaller tree is hung from the edge, so the tree
+#needs no second pass once the last edge is in, only a final turn to make root its root
+def kruskal(graph, root, rng):
+
+    sets = list(range(graph.size))
+    sizes = [1] * graph.size
+    parent = list(range(graph.size))
+
+    def find(v):
+        while sets[v] != v:
+            sets[v] = sets[sets[v]]
+            v = sets[v]
+        return v
+
+    a, b = graph.edges()
+    order = np.random.default_rng(rng.getrandbits(64)).permutation(len(a))
+
+    for u, v in zip(a[order].tolist(), b[order].tolist()):
+        set_u, set_v = find(u), find(v)
+        if set_u == set_v:
+            continue
+        if sizes[set_u] > sizes[set_v]:
+            u, v, set_u, set_v = v, u, set_v, set_u
+        sets[set_u] = set_v
+        sizes[set_v] += sizes[set_u]
+        hang(parent, u, v)
+
+    hang(parent, root, root)
+    return parent
+
+
+#Wilson's algorithm, random walks from cells outside the maze until they hit it, with loops erased
+def wilson(graph, root, rng):
+
+    bits, slots = graph.slots()
+    draw = rng.getrandbits
+    parent = [-1] * graph.size
+    parent[root] = root
+    step = [-1] * graph.size    #last cell the current walk went to from each cell, overwriting it erases loops
+
+    for start in np.random.default_rng(draw(64)).permutation(graph.size).tolist():
+        if parent[start] >= 0:
+            continue
+
+        #walk until the maze is reached
+        v = start
+        while parent[v] < 0:
+            u = slots[v << bits | draw(bits)]
+            if u >= 0:
+                step[v] = v = u
+
+        #add the loop-erased walk
+        v = start
+        while parent[v] < 0:
+            parent[v] = v = step[v]
+
+    return parent
+
+
+#randomized Prim, grows the maze from root through a random frontier edge each step
+def prim(graph, root, rng):
+
+    indptr, indices = graph.as_lists()
+    parent = [-1] * graph.size
+    parent[root] = root
+    frontier = [(root, u) for u in indices[indptr[root]:indptr[root + 1]]]
+
+    while frontier:
+        #swap a random entry to the end so it can be removed in O(1)
+        k = int(rng.random() * len(frontier))
+        frontier[k], frontier[-1] = frontier[-1], frontier[k]
+        v, u = frontier.pop()
+        if parent[u] >= 0:
+            continue
+        parent[u] = v
+        for w in indices[indptr[u]:indptr[u + 1]]:
+            if parent[w] < 0:
+                frontier.append((u, w))
+
+    return parent
+
+
+ALGORITHMS = {
+    "dfs": dfs,
+    "kruskal": kruskal,
+    "wilson": wilson,
+    "prim": prim,
+}
+
+
+#the cells from v back to the root of a parent list, v first
+def route(parent, v):
+    cells = [v]
+    while parent[v] != v:
+        v = parent[v]
+        cells.append(v)
+    return cells
+
+
+#the maze itself (its open passages) as a CellGraph, from a parent list
+def passages(parent, shape = None):
+    parent = np.asarray(parent, dtype=np.int64)
+    child = np.flatnonzero((parent >= 0) & (parent != np.arange(len(parent))))
+    return CellGraph.from_edges(len(parent), child, parent[child], shape)
+
+
+"""
+*********************************************************************************************
+*
+*                               -- distances() --
+*
+*   Purpose: Steps from the nearest source cell to every cell of a graph
+*   Parameters: graph - a CellGraph, usually passages() of a maze
+*               sources - list or array of cells
+*   Return Values: int32 array of graph.size, -1 for cells that cannot be reached
+*
+*   Operation: Breadth first search a level at a time. The neighbors of the whole frontier are
+*   gathered from the CSR arrays with one np.repeat, so there are no per-cell Python steps.
+*   For a maze with its parent list at hand, tree_distances() does not depend on the levels
+*
+*********************************************************************************************
+"""
+def distances(graph, sources):
+
+    dist = np.full(graph.size, -1, dtype=np.int32)
+    frontier = np.unique(np.asarray(sources, dtype=np.int64))
+    dist[frontier] = 0
+    level = 0
+
+    while len(frontier):
+        level += 1
+        starts = graph.indptr[frontier]
+        counts = graph.indptr[frontier + 1] - starts
+        firsts = np.cumsum(counts) - counts
+        slots = np.arange(counts.sum()) - np.repeat(firsts - starts, counts)
+        nxt = np.unique(graph.indices[slots])
+        nxt = nxt[dist[nxt] < 0]
+        dist[nxt] = level
+        frontier = nxt
+
+    return dist
+
+
+"""
+*********************************************************************************************
+*
+*                               -- tree_distances() --
+*
+*   Purpose: Steps from one cell to every cell of a maze, straight from its parent list
+*   Parameters: parent - parent list of a generator
+*               source - the cell to measure from
+*   Return Values: int32 array of len(parent), -1 for cells that are not in the maze
+*
+*   Operation: A depth first maze has a level for almost every cell of its corridors, so
+*   distances() would take a numpy step per cell. In a tree every cell's way to the source runs
+*   up to the first cell of route(parent, source), then along that route, which re-roots the
+*   tree at the source. Pointer jumping finds that first cell: every pointer starts at the
+*   parent (or at the cell itself on the route), and each pass adds the steps counted by the
+*   cell a pointer reaches and moves it to that cell's pointer, doubling how far it goes, so
+*   about log2 of the depth of the tree passes reach the route from everywhere
+*
+*********************************************************************************************
+"""
+def tree_distances(parent, source):
+
+    parent = np.asarray(parent, dtype=np.int64)
+    along = np.full(len(parent), -1, dtype=np.int32)
+    path = np.array(route(parent, source), dtype=np.int64)
+    along[path] = np.arange(len(path), dtype=np.int32)
+
+    cells = np.arange(len(parent), dtype=np.int64)
+    stay = (along >= 0) | (parent < 0)
+    up = np.where(stay, cells, parent)
+    steps = (~stay).astype(np.int32)
+    while True:
+        further = up[up]
+        if (further == up).all():
+            break
+        steps += steps[up]
+        up = further
+
+    return np.where(along[up] >= 0, steps + along[up], -1).astype(np.int32)
+
@@ -0,0 +1,164 @@
+"""
+****************************************************************************************************
+
+                            ----Streaming Maze Generation----
+
+****************************************************************************************************
+
+Purpose:
+    Makes mazes too tall to keep in memory. MazeStream never builds the height by width array of Maze,
+    it produces the maze one row at a time with Eller's algorithm, keeping only the state of the current
+    row, so memory grows with the width alone. The rows can go straight to a file or socket with write().
+
+Operation (Eller's algorithm):
+    Every point (odd row and column, as in Maze) of the current row belongs to a numbered set, points in
+    the same set are already joined by some path above. For every row:
+        1. points without a set (nothing came down to them) get a new set of their own
+        2. neighbors in different sets are joined at random, merging their sets (joining two points of the
+           same set would make a loop, so it is never done). On the last row every such pair is joined so
+           that the whole maze ends up connected
+        3. every set opens at least one random passage down into the next row, the points below those
+           passages keep the set and the rest of the next row starts without one
+    The sets are kept as lists of columns and the smaller one is merged into the larger, so a row costs
+    close to O(width).
+
+Output:
+    Rows are uint8 arrays of the Maze encoding (1 fixed wall, 0 wall between points, 3 passage). A maze
+    has one route between any two points, like Maze. The entry on the left side and the exit on the right
+    side are random odd rows and marked with 2, as starting_path() does. The solution path itself is not
+    marked, since it is only known once the whole maze exists.
+
+    write() sends the rows to any binary stream, raw (one byte per square, np.fromfile(path, dtype=np.uint8)
+    .reshape(-1, width) reads it back) or as text (one line of digits per row).
+
+Usage:
+    stream = MazeStream(height = 100001, width = 101, seed = 7)
+    with open("maze.bin", "wb") as out:
+        stream.write(out)
+    for row in stream.rows():
+        ...
+
+"""
+
+import random
+import numpy as np
+from Puzzle import Puzzle
+
+
+class MazeStream(Puzzle):
+
+    def __init__(self, name=None, creator=None, subject=None, height=None, width=None, seed=None):
+        super().__init__(name, creator, subject, seed)
+
+        #same sizes as Maze, odd and 25 by default
+        self.width = 25
+        self.height = 25
+        if width:
+            if width % 2 == 0:
+                width += 1
+            self.width = width
+        if height:
+            if height % 2 == 0:
+                height += 1
+            self.height = height
+
+        start = self.rng.randint(0, (self.height//2 - 1))*2 + 1
+        end = self.rng.randint(0, (self.height//2 - 1))*2 + 1
+        self.starting_pos = (start, 0)
+        self.last_pos = (end, self.width - 2)
+
+    """
+    *********************************************************************************************
+    *
+    *                               -- rows() --
+    *
+    *   Purpose: Generate the maze
+    *   Parameters: None
+    *   Return Values: generator of the maze's rows, top to bottom (uint8 arrays of width)
+    *
+    *   Operation: Eller's algorithm as described above. labels holds the set of every column of
+    *   the current row (0 = none yet) and members the columns of every set. The random numbers
+    *   come from a generator made from the seed for this call, so iterating again gives the
+    *   same maze
+    *
+    *********************************************************************************************
+    """
+    def rows(self):
+
+        rng = random.Random(self.seed)
+        width = self.width
+        cols = (width - 1) // 2
+        last_row = (self.height - 1) // 2 - 1
+        labels = [0] * cols
+        members = {}
+        next_label = 1
+
+        border = np.ones(width, dtype=np.uint8)
+        yield border.copy()
+
+        for r in range(last_row + 1):
+
+            #1. new sets for the points nothing came down to
+            for c in range(cols):
+                if not labels[c]:
+                    labels[c] = next_label
+                    members[next_label] = [c]
+                    next_label += 1
+
+            #2. join neighbors of different sets
+            joins = np.zeros(cols - 1, dtype=bool)
+            for c in range(cols - 1):
+                a, b = labels[c], labels[c + 1]
+                if a != b and (r == last_row or rng.getrandbits(1)):
+                    joins[c] = True
+                    if len(members[a]) < len(members[b]):
+                        a, b = b, a
+                    for k in members[b]:
+                        labels[k] = a
+                    members[a] += members.pop(b)
+
+            row = np.zeros(width, dtype=np.uint8)
+            row[0] = row[-1] = 1
+            row[1::2] = 3
+            row[2:-1:2][joins] = 3
+            if r * 2 + 1 == self.starting_pos[0]:
+                row[0] = 2
+            if r * 2 + 1 == self.last_pos[0]:
+                row[-1] = 2
+            yield row
+
+            if r == last_row:
+                break
+
+            #3. at least one passage down from every set
+            down = np.zeros(cols, dtype=bool)
+            below = {}
+            for label, columns in members.items():
+                chosen = [c for c in columns if rng.getrandbits(1)]
+                if not chosen:
+                    chosen = [columns[rng.randint(0, len(columns) - 1)]]
+                for c in columns:
+                    labels[c] = 0
+                for c in chosen:
+                    labels[c] = label
+                down[chosen] = True
+                below[label] = chosen
+            members = below
+
+            wall = np.zeros(width, dtype=np.uint8)
+            wall[0::2] = 1
+            wall[1::2][down] = 3
+            yield wall
+
+        yield border.copy()
+
+    #writes every row to a binary stream (file, socket.makefile("wb"), ...), returns the number of rows
+    def write(self, out, text = False):
+        count = 0
+        for row in self.rows():
+            if text:
+                out.write((row + ord("0")).tobytes() + b"\n")
+            else:
+                out.write(row.tobytes())
+            count += 1
+        return count
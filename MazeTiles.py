@@ -0,0 +1,228 @@
+"""
+****************************************************************************************************
+
+                            ----Out of Core Maze Generation----
+
+****************************************************************************************************
+
+Purpose:
+    Makes mazes far bigger than memory (poster mazes of 50,000 by 50,000 points and up). The maze lives
+    in a file on local disk, one byte per square in the encoding of Maze.py (the same raw format as
+    MazeStream.write(), np.fromfile(path, dtype=np.uint8).reshape(height, width) reads a small one back),
+    and is made one square tile of points at a time, so memory only depends on the tile size.
+
+Operation:
+    1. The tiles themselves form a small lattice, and one of the MazeGenerators algorithms makes a maze
+       of it, rooted at the tile holding the entry. Every passage of that tile maze becomes one door, a
+       random opening in the wall two neighboring tiles share. As every tile will be a maze (a tree) and
+       the tiles are joined by a tree of single doors, the whole is again a perfect maze: exactly one
+       route between any two points.
+    2. Following the tile maze's parents from the exit tile back to the entry tile gives the tiles the
+       solution passes through, and for each of them the door the route comes in by and goes out by.
+    3. Every tile is made in memory with the same algorithm, rooted at the point behind its entry door
+       if it is on the route, the route through it is marked with 2 from the parents, its doors are
+       opened and the tile is written into a np.memmap of the rows it covers. Neighboring tiles share
+       their border squares, both write the same walls and doors there. After each tile the map is
+       flushed and closed so its pages leave memory again.
+
+    Peak memory is a few tile arrays and the parent list of one tile plus the tile maze, whatever the
+    size of the maze: about 10 MB above the interpreter for the default tile of 256 by 256 points and
+    35 MB for 512 by 512.
+
+Usage:
+    maze = TiledMaze("poster.maze", height = 100001, width = 100001, seed = 7)
+    maze.maze[0:21, 0:41]      read-only np.memmap of the finished maze
+
+"""
+
+import random
+import numpy as np
+from Puzzle import Puzzle
+from MazeGenerators import ALGORITHMS
+
+
+#the empty lattice of Maze.init_maze() for any size
+def lattice(height, width):
+    grid = np.zeros((height, width), dtype=np.uint8)
+    grid[0, :] = grid[-1, :] = 1
+    grid[:, 0] = grid[:, -1] = 1
+    grid[2:height - 1:2, 2:width - 1:2] = 1
+    return grid
+
+
+class TiledMaze(Puzzle):
+
+    def __init__(self, path, height=None, width=None, tile=256, algorithm="prim",
+        name=None, creator=None, subject=None, seed=None):
+
+        super().__init__(name, creator, subject, seed)
+        if algorithm not in ALGORITHMS:
+            raise ValueError("unknown maze algorithm %r, expected one of %r" % (algorithm, sorted(ALGORITHMS)))
+
+        #same sizes as Maze, odd and 25 by default
+        self.width = 25
+        self.height = 25
+        if width:
+            if width % 2 == 0:
+                width += 1
+            self.width = width
+        if height:
+            if height % 2 == 0:
+                height += 1
+            self.height = height
+
+        self.path = path
+        self.tile = tile            #points per side of a tile
+        self.algorithm = algorithm
+        self.starting_pos = None
+        self.last_pos = None
+        self.stats = {}
+        self.maze = None            #read-only np.memmap of the file once it is made
+
+        self.create_maze()
+
+    #rows and columns of points covered by tile (i, j), as [start, stop) ranges
+    def tile_points(self, i, j):
+        rows, cols = (self.height - 1) // 2, (self.width - 1) // 2
+        return (i * self.tile, min(rows, (i + 1) * self.tile)), (j * self.tile, min(cols, (j + 1) * self.tile))
+
+    """
+    *********************************************************************************************
+    *
+    *                               -- plan_tiles() --
+    *
+    *   Purpose: Steps 1 and 2, the doors between tiles and the route through them
+    *   Parameters: trows, tcols - tiles down and across
+    *   Return Values: doors - {tile: [door squares]}, every door listed for both of its tiles
+    *                  route - {tile: (in door, out door)} for the tiles the solution passes
+    *
+    *   Operation: A maze of trows by tcols points is made with the chosen algorithm, rooted at
+    *   the entry tile, and every passage in it is turned into a door at a random point of the
+    *   wall between the two tiles. Doors are (row, col) squares of the whole maze
+    *
+    *********************************************************************************************
+    """
+    def plan_tiles(self, trows, tcols):
+
+        twidth = 2 * tcols + 1
+        tiles = lattice(2 * trows + 1, twidth)
+        entry_tile = (self.starting_pos[0] // 2 // self.tile, 0)
+        exit_tile = (self.last_pos[0] // 2 // self.tile, tcols - 1)
+        flat = lambda tile: (2 * tile[0] + 1) * twidth + 2 * tile[1] + 1
+        parent = ALGORITHMS[self.algorithm](memoryview(tiles.reshape(-1)), twidth, flat(entry_tile), self.rng)
+
+        doors = {}
+        towards = {}        #tile -> the door to its parent tile
+        for i in range(trows):
+            for j in range(tcols):
+                up = parent[flat((i, j))]
+                if up == flat((i, j)):
+                    continue
+                pi, pj = (up // twidth - 1) // 2, (up % twidth - 1) // 2
+                if pi == i:
+                    (r0, r1), cols = self.tile_points(i, j)
+                    door = (2 * self.rng.randrange(r0, r1) + 1, 2 * max(j, pj) * self.tile)
+                else:
+                    rows, (c0, c1) = self.tile_points(i, j)
+                    door = (2 * max(i, pi) * self.tile, 2 * self.rng.randrange(c0, c1) + 1)
+                doors.setdefault((i, j), []).append(door)
+                doors.setdefault((pi, pj), []).append(door)
+                towards[(i, j)] = (door, (pi, pj))
+
+        #walk from the exit tile back to the entry tile, the door to the parent is the way in
+        route = {}
+        tile, out_door = exit_tile, (self.last_pos[0], self.width - 1)
+        while tile != entry_tile:
+            door, up = towards[tile]
+            route[tile] = (door, out_door)
+            tile, out_door = up, door
+        route[entry_tile] = (self.starting_pos, out_door)
+        return doors, route
+
+    #flat index (in a tile array) of the point inside the tile next to a door square
+    def behind(self, door, top, left, twidth, theight):
+        row, col = door[0] - top, door[1] - left
+        if col == 0:
+            col = 1
+        elif col == twidth - 1:
+            col -= 1
+        elif row == 0:
+            row = 1
+        elif row == theight - 1:
+            row -= 1
+        return row * twidth + col
+
+    """
+    *********************************************************************************************
+    *
+    *                               -- create_maze() --
+    *
+    *   Purpose: Make the maze file
+    *   Parameters: None
+    *   Return Values: None
+    *
+    *   Operation: Plans the tiles, then makes and writes them one at a time (step 3 above).
+    *   self.stats records the number of tiles and the points made
+    *
+    *********************************************************************************************
+    """
+    def create_maze(self):
+
+        rows, cols = (self.height - 1) // 2, (self.width - 1) // 2
+        trows, tcols = -(-rows // self.tile), -(-cols // self.tile)
+        start = self.rng.randint(0, rows - 1) * 2 + 1
+        end = self.rng.randint(0, rows - 1) * 2 + 1
+        self.starting_pos = (start, 0)
+        self.last_pos = (end, self.width - 2)
+
+        with open(self.path, "wb") as out:
+            out.truncate(self.height * self.width)
+        doors, route = self.plan_tiles(trows, tcols)
+        generator = ALGORITHMS[self.algorithm]
+
+        for i in range(trows):
+            for j in range(tcols):
+                (r0, r1), (c0, c1) = self.tile_points(i, j)
+                top, left = 2 * r0, 2 * c0
+                tile = lattice(2 * (r1 - r0) + 1, 2 * (c1 - c0) + 1)
+                theight, twidth = tile.shape
+                cells = memoryview(tile.reshape(-1))
+                rng = random.Random(self.rng.getrandbits(64))
+
+                #the tile's maze, rooted behind the door the route comes in by
+                ways = route.get((i, j))
+                root = self.behind(ways[0], top, left, twidth, theight) if ways else twidth + 1
+                parent = generator(cells, twidth, root, rng)
+
+                #the route through the tile, from behind its out door back to the root
+                if ways:
+                    point = self.behind(ways[1], top, left, twidth, theight)
+                    while point != root:
+                        up = parent[point]
+                        cells[point] = cells[(point + up) // 2] = 2
+                        point = up
+                    cells[root] = 2
+
+                #borders shared with other tiles are walls between points (0), not fixed walls
+                if top > 0:
+                    tile[0, 1::2] = 0
+                if top + theight < self.height:
+                    tile[-1, 1::2] = 0
+                if left > 0:
+                    tile[1::2, 0] = 0
+                if left + twidth < self.width:
+                    tile[1::2, -1] = 0
+                for door in doors.get((i, j), []):
+                    tile[door[0] - top, door[1] - left] = 3
+                if ways:
+                    for door in ways:
+                        tile[door[0] - top, door[1] - left] = 2
+
+                region = np.memmap(self.path, dtype=np.uint8, mode="r+",
+                    offset=top * self.width, shape=(theight, self.width))
+                region[:, left:left + twidth] = tile
+                region.flush()
+                del region
+
+        self.stats = {"tiles": trows * tcols, "points": rows * cols}
+        self.maze = np.memmap(self.path, dtype=np.uint8, mode="r", shape=(self.height, self.width))
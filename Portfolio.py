@@ -0,0 +1,184 @@
+"""
+****************************************************************************************************
+
+                            ----Parallel Multi-Start Generation----
+
+****************************************************************************************************
+
+Purpose:
+    The randomized generators (Crossword.make_puzzle(), WordSearch.scramble(), ...) usually finish
+    quickly, but now and then a seed leads into a long search. Running several differently seeded
+    attempts at once and keeping the first one that succeeds cuts off that tail: the time to a puzzle
+    becomes the fastest of K attempts instead of whatever one attempt happens to take, so on a host with
+    K free cores the slow cases come down to about the usual time.
+
+Operation:
+    run() draws K seeds and starts one attempt per seed in the portfolio's multiprocessing pool of
+    worker processes, each building the puzzle with its own seed (see Puzzle.py, the same seed always
+    gives the same puzzle, so the winner can be made again from its seed alone). Results come back in
+    the order the attempts finish. A puzzle counts as a success unless its constructor raised, it has a
+    solved attribute that is False (Crossword, CrosswordFill) or it could not be sent back from the
+    worker (puzzles are pickled on the way, see Maze.__getstate__()).
+
+    The pool is made by the first run() and kept for the next ones, so the workers are only started
+    once. The workers share a deadline with run() (Puzzle.deadline), which the over_budget() of the
+    searches checks next to their own node and time budgets. It is the timeout while a run goes on, and
+    once the winner is in (or timeout ran out) it is moved into the past: the attempts still running
+    give up at their next budget check and the queued ones return without starting. The winner is
+    returned at once, the attempts left behind are collected at the start of the next run(). Puzzles
+    without a budget (Maze, WordSearch) finish their attempt first. close() ends the pool, a with block
+    closes it on the way out.
+
+    self.stats records the seconds every finished attempt took, their percentiles, how many attempts
+    were still running when the winner came in (cancelled) and the seed of the winner.
+
+Usage:
+    with Portfolio(workers = 4) as portfolio:
+        puzzle = portfolio.run(Crossword, word_bank = words, questions = clues)
+        maze = portfolio.run(Maze, height = 201, width = 201)
+    portfolio.stats
+
+"""
+
+import multiprocessing
+import random
+import time
+import numpy as np
+from Puzzle import Puzzle
+
+
+#runs in every worker process as it starts, the puzzles made there see the deadline of run()
+def share_deadline(deadline):
+    Puzzle.deadline = deadline
+
+
+#one attempt in a worker process, returns (seed, puzzle or None, seconds, error)
+def attempt(job):
+
+    puzzle_type, params, seed = job
+    start = time.perf_counter()
+    if Puzzle.deadline is not None and time.time() >= Puzzle.deadline.value:
+        return seed, None, 0.0, None
+    try:
+        puzzle = puzzle_type(seed=seed, **params)
+    except Exception as error:
+        return seed, None, time.perf_counter() - start, repr(error)
+    if not getattr(puzzle, "solved", True):
+        return seed, None, time.perf_counter() - start, None
+    return seed, puzzle, time.perf_counter() - start, None
+
+
+class Portfolio:
+
+    def __init__(self, workers = None, attempts = None, timeout = None):
+
+        self.workers = workers or multiprocessing.cpu_count()
+        self.attempts = attempts or self.workers    #attempts per run(), queued when more than workers
+        self.timeout = timeout                      #seconds run() waits for a success, None means no limit
+        self.pool = None                            #worker processes, made by the first run()
+        self.deadline = None                        #the deadline shared with the workers (see share_deadline())
+        self.pending = None                         #(results, count) of the attempts the last run() left running
+        self.stats = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    #ends the worker processes, the next run() starts new ones
+    def close(self):
+        if self.pool is not None:
+            self.pool.terminate()
+            self.pool.join()
+            self.pool = None
+            self.pending = None
+
+    #waits for the attempts the last run() left running, they gave up when its deadline passed
+    def drain(self):
+        if self.pending is not None:
+            results, count = self.pending
+            self.pending = None
+            for _ in range(count):
+                try:
+                    results.next()
+                except Exception:
+                    pass
+
+    """
+    *********************************************************************************************
+    *
+    *                               -- run() --
+    *
+    *   Purpose: Makes one puzzle with the first of several seeded attempts to succeed
+    *   Parameters: puzzle_type - the puzzle class
+    *               seed - seed for drawing the attempts' seeds, None for a random one
+    *               params - keyword parameters for its constructor (not seed)
+    *   Return Values: the puzzle, or None if every attempt failed or timeout ran out
+    *
+    *********************************************************************************************
+    """
+    def run(self, puzzle_type, seed = None, **params):
+
+        rng = random.Random(seed)
+        seeds = [rng.getrandbits(63) for _ in range(self.attempts)]
+        jobs = [(puzzle_type, params, s) for s in seeds]
+        if self.pool is None:
+            self.deadline = multiprocessing.RawValue("d", 0.0)
+            self.pool = multiprocessing.Pool(self.workers, initializer=share_deadline, initargs=(self.deadline,))
+        self.drain()
+
+        start = time.perf_counter()
+        times = []
+        failures = []
+        winner = None
+        done = 0            #attempts that came back, with or without their time
+        results = None
+        self.deadline.value = float("inf") if self.timeout is None else time.time() + self.timeout
+        try:
+            results = self.pool.imap_unordered(attempt, jobs)
+            for _ in jobs:
+                left = None
+                if self.timeout is not None:
+                    left = max(self.timeout - (time.perf_counter() - start), 0)
+                try:
+                    seed_used, puzzle, seconds, error = results.next(left)
+                except multiprocessing.TimeoutError:
+                    break
+                #the attempt ran but its result could not come back (a puzzle that cannot be pickled)
+                except Exception as error:
+                    done += 1
+                    failures.append((None, repr(error)))
+                    continue
+                done += 1
+                times.append(seconds)
+                if puzzle is None:
+                    failures.append((seed_used, error))
+                    continue
+                winner = (seed_used, puzzle)
+                break
+        finally:
+            #the attempts still running give up at their next budget check
+            self.deadline.value = 0.0
+            if results is not None and done < len(jobs):
+                self.pending = (results, len(jobs) - done)
+
+        self.stats = self.summary(times, failures, len(jobs), done, winner, time.perf_counter() - start)
+        return winner[1] if winner else None
+
+    #the attempt-time distribution of one run()
+    def summary(self, times, failures, count, done, winner, seconds):
+        ms = np.array(times) * 1000
+        return {
+            "attempts": count,
+            "finished": done,
+            "failed": len(failures),
+            "cancelled": count - done,
+            "winner_seed": winner[0] if winner else None,
+            "errors": [error for _, error in failures if error],
+            "times": times,
+            "p50_ms": float(np.percentile(ms, 50)) if len(ms) else None,
+            "p90_ms": float(np.percentile(ms, 90)) if len(ms) else None,
+            "p99_ms": float(np.percentile(ms, 99)) if len(ms) else None,
+            "seconds": seconds,
+        }
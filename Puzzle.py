@@ -10,18 +10,35 @@
     *
     *   Operation: Contains functions used by multiple puzzles
     *
+    *   Randomness: Every puzzle has its own random number generators, rng (random.Random) and
+    *   np_rng (numpy Generator), both created from the seed attribute. Puzzles must only use these,
+    *   never the global random or np.random modules, so that the same parameters and seed always
+    *   give the same puzzle and puzzles built in parallel never share state. If no seed is given a
+    *   random 63-bit one is drawn, so it always fits in 8 bytes when stored in place of the puzzle
+    *
     *********************************************************************************************
     """
 
 
 import numpy as np
+import random
+import time
 class Puzzle:
 
-    def __init__(self, name = None, creator = None, subject = None):
+    #a deadline shared with Portfolio.py (time.time() seconds in a multiprocessing RawValue), set in its worker
+    #processes only. Once it has passed every search with a budget gives up, see stopped()
+    deadline = None
+
+    def __init__(self, name = None, creator = None, subject = None, seed = None):
 
         self.name = name
         self.creator = creator
         self.subject = subject
+        if seed is None:
+            seed = random.SystemRandom().getrandbits(63)
+        self.seed = seed
+        self.rng = random.Random(seed)
+        self.np_rng = np.random.default_rng(seed)
 
     #takes a string and converts into a numpy array of ASCII values
     def word_array(self, word):
@@ -33,3 +50,7 @@ class Puzzle:
             if len(w) > long:
                 long = len(w)
         return long
+
+    #True once the shared deadline of a Portfolio run has passed, checked by the over_budget() of the searches
+    def stopped(self):
+        return self.deadline is not None and time.time() >= self.deadline.value
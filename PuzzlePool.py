@@ -0,0 +1,214 @@
+"""
+****************************************************************************************************
+
+                            ----Pre-Generated Puzzle Pool----
+
+****************************************************************************************************
+
+Purpose:
+    Every puzzle class does all of its generation work in __init__, so a request that creates a puzzle
+    has to wait for the whole algorithm (and any of its restarts). The pool keeps a reservoir of
+    ready-made puzzles for each puzzle type and set of parameters so that a request only has to take one.
+
+Operation:
+    A reservoir is a deque keyed by the puzzle class and its parameters, e.g. (Sudoku, diff=3) and
+    (Sudoku, diff=5) are separate reservoirs. take() pops from the left of the deque, which is O(1). If the
+    reservoir is empty the puzzle is generated on the spot instead (a miss). Whenever a reservoir drops
+    below the low-water mark it is marked pending and a background thread is woken, which tops the pending
+    reservoirs back up to their capacity, making one puzzle at a time outside of the lock so that take() is
+    never blocked by generation, and sleeps until it is woken again. A constructor that raises (a Sudoku
+    running out of its budget, say) is counted as a failure. After 3 failures in a row the reservoir is left
+    until it next drops below the mark, so a broken parameter set cannot keep the thread busy, and the
+    thread itself keeps running.
+
+    List parameters (word banks) are stored as tuples so they can be part of the key, and a new list is
+    passed to every puzzle since Crossword and WordSearch sort their word bank in place.
+
+Usage:
+    pool = PuzzlePool(capacity = 20, low_water = 5)
+    pool.add(Sudoku, diff = 3)
+    pool.add(Maze, height = 51, width = 51, steps = 2)
+    pool.start()
+    puzzle = pool.take(Sudoku, diff = 3)
+    pool.stats()
+
+"""
+
+import threading
+import time
+from collections import deque
+
+
+#turns keyword parameters into a hashable key, lists become tuples
+def freeze(params):
+    return tuple(sorted(
+        (k, tuple(v) if isinstance(v, list) else v) for k, v in params.items()
+    ))
+
+
+#turns a key back into keyword parameters, with fresh lists
+def thaw(frozen):
+    return {k: list(v) if isinstance(v, tuple) else v for k, v in frozen}
+
+
+class PuzzlePool:
+
+    def __init__(self, capacity = 16, low_water = 4):
+
+        self.capacity = capacity        #puzzles kept per reservoir after a refill
+        self.low_water = low_water      #a reservoir smaller than this triggers a refill
+        self.reservoirs = {}
+        self.counters = {}
+        self.pending = set()            #reservoirs that dropped below low_water and are being topped up
+        self.streaks = {}               #failed builds in a row for each reservoir
+        self.lock = threading.Lock()
+        self.wake = threading.Event()
+        self.running = False
+        self.thread = None
+
+    def key(self, puzzle_type, params):
+        return (puzzle_type, freeze(params))
+
+    #registers a puzzle type and parameter set so the pool keeps it filled
+    def add(self, puzzle_type, **params):
+        key = self.key(puzzle_type, params)
+        with self.lock:
+            if key not in self.reservoirs:
+                self.reservoirs[key] = deque()
+                self.counters[key] = {
+                    "hits": 0, "misses": 0, "refilled": 0, "refill_time": 0.0, "failures": 0
+                }
+                self.pending.add(key)
+        self.wake.set()
+        return key
+
+    """
+    *********************************************************************************************
+    *
+    *                               -- take() --
+    *
+    *   Purpose: Get a ready puzzle
+    *   Parameters: puzzle_type - the puzzle class (Sudoku, Maze, Crossword, WordSearch)
+    *               params - keyword parameters for its constructor
+    *   Return Values: a puzzle object
+    *
+    *   Operation: Pops a pooled puzzle if there is one (a hit), otherwise builds one right away
+    *   (a miss). Unknown parameter sets are added to the pool so later calls will hit. Wakes the
+    *   refill thread if the reservoir is under the low-water mark
+    *
+    *********************************************************************************************
+    """
+    def take(self, puzzle_type, **params):
+
+        key = self.key(puzzle_type, params)
+        if key not in self.reservoirs:
+            self.add(puzzle_type, **params)
+
+        puzzle = None
+        with self.lock:
+            reservoir = self.reservoirs[key]
+            if reservoir:
+                puzzle = reservoir.popleft()
+                self.counters[key]["hits"] += 1
+            else:
+                self.counters[key]["misses"] += 1
+            low = len(reservoir) < self.low_water
+            if low:
+                self.pending.add(key)
+
+        if low:
+            self.wake.set()
+        if puzzle is None:
+            puzzle = puzzle_type(**thaw(key[1]))
+        return puzzle
+
+    #finds a pending reservoir that is not full yet, preferring the emptiest one
+    def next_refill(self):
+        with self.lock:
+            for key in [k for k in self.pending if len(self.reservoirs[k]) >= self.capacity]:
+                self.pending.discard(key)
+            needy = [(len(self.reservoirs[k]), k) for k in self.pending]
+        if not needy:
+            return None
+        return min(needy, key=lambda n: n[0])[1]
+
+    #builds one puzzle for a reservoir and records it, False if the constructor raised
+    def build(self, key):
+
+        start = time.perf_counter()
+        try:
+            puzzle = key[0](**thaw(key[1]))
+        except Exception:
+            with self.lock:
+                self.counters[key]["failures"] += 1
+                self.streaks[key] = self.streaks.get(key, 0) + 1
+            return False
+        elapsed = time.perf_counter() - start
+
+        with self.lock:
+            self.streaks[key] = 0
+            self.reservoirs[key].append(puzzle)
+            self.counters[key]["refilled"] += 1
+            self.counters[key]["refill_time"] += elapsed
+        return True
+
+    #background loop, tops up pending reservoirs one puzzle at a time and sleeps until woken
+    def refill(self):
+
+        while self.running:
+            key = self.next_refill()
+            if key is None:
+                self.wake.clear()
+                if self.running and self.next_refill() is None:
+                    self.wake.wait()
+                continue
+            if not self.build(key):
+                with self.lock:
+                    if self.streaks[key] >= 3:
+                        self.pending.discard(key)
+                        self.streaks[key] = 0
+
+    #fills every reservoir to capacity in the calling thread, useful at startup, a reservoir whose
+    #constructor fails 3 times in a row is skipped
+    def prefill(self):
+        for key in list(self.reservoirs):
+            self.streaks[key] = 0
+            while len(self.reservoirs[key]) < self.capacity and self.streaks[key] < 3:
+                self.build(key)
+            self.streaks[key] = 0
+
+    def start(self):
+        if self.running:
+            return
+        self.running = True
+        self.thread = threading.Thread(target=self.refill, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.running = False
+        self.wake.set()
+        if self.thread:
+            self.thread.join()
+            self.thread = None
+
+    #current size, hit/miss counts and refill rate of every reservoir
+    def stats(self):
+
+        report = {}
+        with self.lock:
+            for key, counts in self.counters.items():
+                taken = counts["hits"] + counts["misses"]
+                rate = 0.0
+                if counts["refill_time"] > 0:
+                    rate = counts["refilled"] / counts["refill_time"]
+                name = key[0].__name__ + str(dict(key[1]))
+                report[name] = {
+                    "size": len(self.reservoirs[key]),
+                    "hits": counts["hits"],
+                    "misses": counts["misses"],
+                    "hit_rate": counts["hits"] / taken if taken else 0.0,
+                    "refilled": counts["refilled"],
+                    "failures": counts["failures"],
+                    "refills_per_sec": rate,
+                }
+        return report
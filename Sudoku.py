@@ -39,10 +39,10 @@ The Algorithm:
     Step 3.) Try to fill the rest of the boxes with valid numbers, except for the last box
         The alogrithm will step through the boxes of the board from left to right and then top to bottom. 
         self.corners describes the top left square in each box. Steps 4 and 5 describe the process of determining
-        a valid box. The method make_puzzle() handles this process and will recurse on the first 8 boxes if one of
-        them fails to be valid after 50 attempts at scrambling the box. However, once it approaches the final, bottom
+        a valid box. The method make_puzzle() handles this process and will abandon the attempt if one of the first 8
+        boxes fails to be valid after 50 attempts at scrambling the box. However, once it approaches the final, bottom
         right box, for the board to be valid there can only be one possible placement of values in the box. If this is not
-        the case, the first box must be reset/reseeded as handled in sudoku_array()
+        the case, the first box must be reset/reseeded as handled in box_array()
 
     Step 4.) (For boxes 2-8) Validate each square in the box
         The method validate_square() will check the possible numbers that can be placed in the given box by comparing the 
@@ -56,57 +56,119 @@ The Algorithm:
         can be placed. Since this is the case, the place_box() method will place zeroes if a square is invalid and will return false
         upon the method's completion if this is the case. This method's caller, make_puzzle() will allow place_box() to be attempted
         50 times in the hope of achieving a valid box, after this many attempts however, the board is corrupt and make_puzzle() will
-        recursively call itself and re-seed the entire board since a new first box will be generated and each consecutive box will be
-        placed according to steps 4 and 5
+        return an empty board so that box_array() re-seeds the entire board, since a new first box will be generated and each
+        consecutive box will be placed according to steps 4 and 5
 
     Step 6.) The final box
         If boxes 2 - 8 are placed, the nature of the Sudoku game then dictates that each square in the final bottom-right box
         can have only 1 unique valid number. Even if the previous boxes were valid, there is still the possibility that this last box
         will reveal a corrupt board. Depending on the randomness of the board, this can overstack if recursion is implemented. (Python
-        documentation does not recommend recursive stacks above 1000) So the method sudoku_array() will loop infinitely calling 
-        make_puzzle() until it achieves a valid final box (and thus a valid board). Again, the algroithm will place zeroes to indicate
-        to other methods that the board is corrupt.
+        documentation does not recommend recursive stacks above 1000) So the method box_array() will loop calling make_puzzle()
+        until it achieves a valid final box (and thus a valid board), or until the max_attempts/timeout budget given to the
+        constructor runs out. Again, the algroithm will place zeroes to indicate to other methods that the board is corrupt.
+        The counters in self.stats (attempts, boxes retried, restarts and final box failures) show where the time went.
+
+    Larger boards:
+        Passing box=4 or box=5 creates 16 by 16 or 25 by 25 boards. These are always filled by the bitboard engine,
+        which restarts a board that takes too long so the time stays bounded, and the time each board took is kept
+        in generation_time. The box-by-box algorithm, batches and grading only support 9 by 9.
+
+    Batches:
+        generate_batch() creates only a few boards this way and turns them into as many as needed by relabeling
+        numbers and reordering/transposing rows and columns, which never breaks a valid board (see SudokuBatch.py)
+
+    Note on speed:
+        Steps 2 - 6 rebuild lists of taken values for every square, which made them the slowest part of creating a
+        board. sudoku_array() now fills the board with the bitboard engine in Bitboard.py instead, which keeps a
+        9-bit mask of the used numbers for each row, column and box and backtracks square by square, so a board is
+        never thrown away. The box-by-box algorithm above is still available through box_array()
 
     Step 7.) Hide the numbers
         Based on the player's difficulty, the algorithm will hide numbers so a game can be played. It is not entirely random though,
         as it will definitely reveal squares in each box, row, and column so that the board is playable on harder difficulties. Note:
         Once the board is hidden, it is possible to achieve a valid board that does not match the board that the algorithm generated.
         As long as the player follows the "one rule" of Sudoku, they still win.
+        If the board is created with unique=True, hide_unique() is used instead. It hides numbers one at a time and
+        uses the exact cover solver in DancingLinks.py to put a number back whenever hiding it would allow a second
+        solution, so the player's board always matches the generated one.
+        symmetry="rotational" or "mirror" reveals squares in symmetric pairs and minimal=True keeps hiding numbers until
+        every remaining one is needed for a unique solution (see SudokuClues.py).
+        With graded=True, hide_graded() also rates every candidate puzzle with the human-technique grader in
+        SudokuGrader.py and keeps hiding (or rejects the board) until the rating matches the difficulty.
 
 """
 
 import numpy as np
-import random as rand
 import json
+import time
 from Puzzle import Puzzle
+from Bitboard import generate
+from DancingLinks import count_solutions
+from SudokuGrader import grade
+import SudokuBatch
+import SudokuCodec
+import SudokuClues
+from SudokuState import SudokuState
 
 
 class Sudoku(Puzzle):
 
-    def __init__(self, diff = None, name = None, creator = None, subject = None):
+    def __init__(self, diff = None, name = None, creator = None, subject = None, unique = False, graded = False,
+        box = 3, max_attempts = None, timeout = None, seed = None, symmetry = None, minimal = False):
 
-        super().__init__(name, creator, subject)
+        super().__init__(name, creator, subject, seed)
+        if graded and box != 3:
+            raise ValueError("graded puzzles are only supported for 9 by 9 boards")
+        self.box = box              #box size, 3 is the normal 9 by 9 board, 4 is 16 by 16, 5 is 25 by 25
+        self.size = box * box
         self.difficulty = diff
-        self.puzzle = np.zeros((9,9), dtype=np.int)
+        self.unique = unique        #if True, hidden numbers are chosen so the puzzle has exactly one solution
+        self.graded = graded        #if True, the puzzle is also rejected until its graded tier matches diff
+        self.symmetry = symmetry    #None, "rotational" or "mirror" pattern of revealed squares
+        self.minimal = minimal      #if True, hide every number that can go while the solution stays unique
+        self.mask = None            #boolean array of the revealed squares
+        self.score = None
+        self.tier = None
+        self.puzzle = np.zeros((self.size, self.size), dtype=np.int64)
+        self.solution = None
+        self.generation_time = None     #seconds sudoku_array() took to fill the board
+        self.max_attempts = max_attempts    #budget for one board, None means no limit
+        self.timeout = timeout              #seconds allowed for one board, None means no limit
+        self.reset_stats()
+
+        #top left squares of every box but the first and last, (0, 3), (0, 6), (3, 0) ... for 9 by 9
         self.corners = [
-            (0, 3), (0, 6), (3, 0), (3, 3), (3, 6), (6, 0), (6, 3)
-        ]
+            (i, j) for i in range(0, self.size, box) for j in range(0, self.size, box)
+        ][1:-1]
         self.puz_json = None
 
         #logic in constructor allows the creation of a new board upon instantiation of a new object 
         # (if difficulty parameter is provided)
         if self.difficulty != None:
             self.puzzle = self.sudoku_array()
-            self.hide_numbers()
+            self.solution = self.puzzle.copy()
+            if self.graded:
+                self.hide_graded()
+                self.mask = self.puzzle > 0
+            elif self.unique or self.minimal:
+                self.hide_unique()
+            else:
+                self.hide_numbers()
             self.puz_json = json.dumps(self.puzzle.tolist())
 
+    #the box by box generator of first_box(), make_puzzle() and box_array() is written for 3 by 3 boxes only
+    def require_classic(self, name):
+        if self.box != 3:
+            raise ValueError("%s() only makes 9 by 9 boards, use sudoku_array() for box = %d" % (name, self.box))
+
     def first_box(self):
 
+        self.require_classic("first_box")
         nums = [i for i in range(1,10)]     #stack of numbers 1 - 9
         for i in range(0, 3):
             for j in range(0, 3):
                 #sets a square to a randomly popped value from the stack
-                self.puzzle[i, j] = nums.pop(rand.randint(0, len(nums)-1))
+                self.puzzle[i, j] = nums.pop(self.rng.randint(0, len(nums)-1))
 
     def place_box(self, corner):
 
@@ -167,7 +229,7 @@ class Sudoku(Puzzle):
     # and a list of remaining numbers in the individual box
     def place_square(self, valid, nbank):
 
-        rand.shuffle(valid)
+        self.rng.shuffle(valid)
         bank = nbank
 
         #finds a number that is valid in rows/columns/boxes by comparing lists. Otherwise returns a 0 to show corruption
@@ -177,9 +239,11 @@ class Sudoku(Puzzle):
                     return vn
         return 0
 
-    #internal function to make the board, NTE recursive
+    #internal function to make one attempt at the board, box_array() repeats it until the board is valid
     def make_puzzle(self):
 
+        self.require_classic("make_puzzle")
+        self.puzzle[:, :] = 0
         self.first_box()    #places the first box
 
         #attempts to place boxes 2-8 
@@ -194,16 +258,21 @@ class Sudoku(Puzzle):
                 if box:
                     break
                 count += 1
+                self.stats["boxes_retried"] += 1
 
                 #however, make_puzzle() will only allow fifty possible retries before it determines that the box
-                # is corrupt and cannot be valid. The recursive call happens at this point.
+                # is corrupt and cannot be valid. The attempt is abandoned with an empty (invalid) board here
+                # and box_array() starts a new one
                 if count > 50:
-                    self.make_puzzle()
+                    self.stats["restarts"] += 1
+                    self.puzzle[:, :] = 0
+                    return self.puzzle
 
         #The last box is the hardest to get right, and only one possible combination will be possible if the previous
         # boxes were placed validly, because of that, no stack is used here as validate_square should only return a single
         # number in its list, if this is not the case a 0 will be placed revealing corruption and will be handled in the 
         # sudoku_array() function 
+        failed = False
         for i in range(6, 9):
             for j in range(6, 9):
                 square = self.validate_square(i, j)
@@ -211,6 +280,9 @@ class Sudoku(Puzzle):
                     self.puzzle[i, j] = square[0]
                 else:
                     self.puzzle[i, j] = 0
+                    failed = True
+        if failed:
+            self.stats["final_box_failures"] += 1
         return self.puzzle
 
     # used in sudoku_array() as a way to provide a final check that there are no zeroes on the board (a valid sudoku game)
@@ -222,46 +294,78 @@ class Sudoku(Puzzle):
                     return False
         return True
 
-    #wrapper function for make_puzzle(), it usually takes 5 - 15 attempts of make_puzzle() before a valid board is generated
-    def sudoku_array(self):
-
-        puz = self.make_puzzle()
-        while True:
+    #clears the per-board counters, called at the start of box_array() and sudoku_array()
+    def reset_stats(self):
+        self.stats = {
+            "attempts": 0,              #make_puzzle() calls, or bitboard fills
+            "boxes_retried": 0,         #failed place_box() calls
+            "restarts": 0,              #attempts abandoned after 50 failures of one box
+            "final_box_failures": 0,    #attempts that reached the last box but could not complete it
+            "backtracks": 0,            #placements undone by the bitboard engine
+            "seconds": 0.0,
+        }
+
+    #True once the attempt or time budget of the constructor is used up, or a Portfolio run is over
+    def over_budget(self, start):
+        if self.stopped():
+            return True
+        if self.max_attempts is not None and self.stats["attempts"] >= self.max_attempts:
+            return True
+        if self.timeout is not None and time.perf_counter() - start >= self.timeout:
+            return True
+        return False
+
+    """
+    *********************************************************************************************
+    *
+    *                               -- box_array() --
+    *
+    *   Purpose: The original box-by-box generator, driven iteratively with a budget
+    *   Parameters: None
+    *   Return Values: the valid board, or None if max_attempts or timeout ran out first, raises a
+*                  ValueError for any box size other than 3
+    *
+    *   Operation: Calls make_puzzle() until validate_puzzle() passes, it usually takes 5 - 15
+    *   attempts. Each attempt starts from an empty board, so nothing from an abandoned attempt is
+    *   reused, and self.stats records where the attempts failed
+    *
+    *********************************************************************************************
+    """
+    def box_array(self):
+
+        self.require_classic("box_array")
+        self.reset_stats()
+        start = time.perf_counter()
+        while not self.over_budget(start):
+            self.stats["attempts"] += 1
+            puz = self.make_puzzle()
 
             #checks if the board is valid and returns the board if so
             if self.validate_puzzle(puz):
+                self.stats["seconds"] = time.perf_counter() - start
                 return puz
 
-            #otherwise calls make_puzzle() infinitely until a board is found
-            else:
-                puz = self.make_puzzle()
+        self.stats["seconds"] = time.perf_counter() - start
+        return None
 
-    #After a valid board is generated, numbers will be hidden based on the player's chosen difficulty
-    def hide_numbers(self):
+    #generates a full valid board of any size with the bitboard engine (see Bitboard.py), much faster than box_array()
+    #raises a RuntimeError if the board could not be made within max_attempts or timeout
+    def sudoku_array(self):
 
-        # revealed is a list of tuples containing coordinates for numbers that will be shown
-        revealed = []
+        self.reset_stats()
+        start = time.perf_counter()
+        board = generate(self.box, self.rng, attempts=self.max_attempts, timeout=self.timeout, stats=self.stats)
+        self.generation_time = time.perf_counter() - start
+        self.stats["seconds"] = self.generation_time
+        if board is None:
+            raise RuntimeError("no %dx%d board within the generation budget" % (self.size, self.size))
+        self.puzzle = board.to_array()
+        return self.puzzle
 
-        #reveals at least one number per box so that the game is playable even if there is a bad random seed
-        revealed.append((rand.randint(0, 2), rand.randint(0, 2)))
-        revealed.append((rand.randint(6, 8), rand.randint(6, 8)))
-        for cor in self.corners:
-            row = cor[0] + rand.randint(0, 2)
-            col = cor[1] + rand.randint(0, 2)
-            revealed.append((row, col))
-
-        #now reveals at least one additional number per row for the same reason
-        count = 0
-        while count < 9:
-            square = (count, rand.randint(0, 8))
-            if square not in revealed:
-                revealed.append(square)
-                count += 1
+    #determines how many more squares will be revealed based on the difficulty, scaled up for larger boards
+    def extra_reveals(self):
 
         difficulty = 0
-        count = 0
-
-        #determines how many more squares will be revealed based on the difficulty
         if self.difficulty == 1:
             difficulty = 7
         if self.difficulty == 2:
@@ -272,17 +376,187 @@ class Sudoku(Puzzle):
             difficulty = 42
         if self.difficulty == 5:
             difficulty = 60
+        return difficulty * self.size * self.size // 81
 
-        #chooses new coordinates randomly, but always unique ones
-        while count < difficulty:
-            square = (rand.randint(0, 8), rand.randint(0, 8))
-            if square not in revealed:
-                revealed.append(square)
-                count += 1
+    #the number of squares hide_numbers() and hide_unique() reveal for the difficulty
+    def reveals(self):
+        return min(self.size * self.size, self.size * 2 + self.extra_reveals())
 
-        #sets all revealed coordinates on the board to 0, so that GUIs can use zeroes as empty squares
-        for i in range(0, 9):
-            for j in range(0, 9):
-                idx = (i, j)
-                if idx not in revealed:
-                    self.puzzle[i, j] = 0
+    #After a valid board is generated, numbers will be hidden based on the player's chosen difficulty
+    #the revealed squares are chosen as a boolean mask by SudokuClues.random_mask(), with at least one per box and row
+    def hide_numbers(self):
+
+        self.mask = SudokuClues.random_mask(self.box, self.reveals(), self.np_rng, self.symmetry)
+
+        #sets all hidden squares on the board to 0, so that GUIs can use zeroes as empty squares
+        self.puzzle[~self.mask] = 0
+
+    """
+    *********************************************************************************************
+    *
+    *                               -- hide_unique() --
+    *
+    *   Purpose: Hide numbers like hide_numbers(), but keep exactly one solution
+    *   Parameters: None
+    *   Return Values: None
+    *
+    *   Operation: Starts from the full board and lets SudokuClues.reduce_mask() hide squares (or
+    *   symmetric pairs of squares) in a random order, asking the Dancing Links solver
+    *   (DancingLinks.py) for up to 2 solutions each time and putting the numbers back if a second
+    *   solution appears. Stops once the number of revealed squares matches the difficulty (the same
+    *   reveals() that hide_numbers() shows), or, if minimal is set, only once no revealed square can
+    *   be hidden any more. Low difficulties may keep a few more numbers than asked for if no other
+    *   square can be hidden
+    *
+    *********************************************************************************************
+    """
+    def hide_unique(self):
+
+        target = 0 if self.minimal else self.reveals()
+        full = self.puzzle.copy()
+        self.mask = SudokuClues.reduce_mask(full, self.np_rng, target, self.symmetry)
+        self.puzzle[~self.mask] = 0
+
+    """
+    *********************************************************************************************
+    *
+    *                               -- hide_graded() --
+    *
+    *   Purpose: Hide numbers until the puzzle is unique and its graded tier equals the difficulty
+    *   Parameters: tries - how many boards may be generated before settling for the last one
+    *   Return Values: True if the tier was matched
+    *
+    *   Operation: Works like hide_unique(), but also grades the puzzle (SudokuGrader.py) after each
+    *   hidden number and puts it back if the puzzle got harder than the difficulty asks for. Hiding
+    *   stops once the tier matches and no more than reveals() squares are shown. If every
+    *   square has been tried without reaching the tier, the board is thrown away and a new one made
+    *
+    *********************************************************************************************
+    """
+    def hide_graded(self, tries = 20):
+
+        target = self.reveals()
+        wanted = self.difficulty
+        for attempt in range(0, tries):
+            if attempt > 0:
+                self.solution = self.sudoku_array().copy()
+            self.puzzle = self.solution.copy()
+            self.score, self.tier = grade(self.puzzle, self.solution)
+            revealed = 81
+            squares = [(i, j) for i in range(0, 9) for j in range(0, 9)]
+            self.rng.shuffle(squares)
+
+            for square in squares:
+                if revealed <= target and self.tier == wanted:
+                    return True
+                num = self.puzzle[square]
+                self.puzzle[square] = 0
+                if count_solutions(self.puzzle, 2) != 1:
+                    self.puzzle[square] = num
+                    continue
+                score, tier = grade(self.puzzle, self.solution)
+                if tier < wanted:
+                    self.puzzle[square] = num
+                    continue
+                self.score, self.tier = score, tier
+                revealed -= 1
+
+            if revealed <= target and self.tier == wanted:
+                return True
+        return False
+
+    """
+    *********************************************************************************************
+    *
+    *                               -- generate_batch() --
+    *
+    *   Purpose: Create n puzzles at once, much faster than calling Sudoku(diff) n times
+    *   Parameters: n - number of puzzles
+    *               diff - difficulty like the constructor, None gives full boards
+    *               seeds - how many boards are generated normally to build the batch from
+    *               unique - hide the seeds with hide_unique() so every puzzle has one solution
+    *               solutions - also return the full boards
+    *               seed - seed for the whole batch, the same seed gives the same batch
+    *   Return Values: (n, 9, 9) uint8 array of puzzles (and one of solutions if asked)
+    *
+    *   Operation: Generates the seed boards with sudoku_array(), then lets SudokuBatch.expand()
+    *   relabel, reorder and transpose them into n different boards with vectorized clue masks
+    *
+    *********************************************************************************************
+    """
+    @classmethod
+    def generate_batch(cls, n, diff = None, seeds = 16, unique = False, solutions = False, seed = None):
+
+        maker = cls(seed=seed)
+        maker.difficulty = diff
+        boards = []
+        masks = []
+        for i in range(0, seeds):
+            boards.append(maker.sudoku_array().copy())
+            if unique and diff != None:
+                maker.hide_unique()
+                masks.append(maker.puzzle > 0)
+
+        reveals = None
+        if diff != None:
+            reveals = min(81, 18 + maker.extra_reveals())
+        puzzles, full = SudokuBatch.expand(np.array(boards), n, maker.np_rng, reveals, masks or None)
+        if solutions:
+            return puzzles, full
+        return puzzles
+
+    #starts an interactive game on this puzzle, see SudokuState.py
+    def state(self):
+        return SudokuState(self.puzzle, self.solution, self.box)
+
+    #packs the board into 41 bytes (4 bits per square), or 52 bytes with the solution (see SudokuCodec.py)
+    #raises a ValueError if the solution is asked for but the board has none
+    def to_bytes(self, solution = False):
+        if self.size != 9:
+            raise ValueError("only 9 by 9 boards can be packed")
+        if solution:
+            if self.solution is None:
+                raise ValueError("the board has no solution to pack")
+            return SudokuCodec.pack_pair(self.puzzle, self.solution).tobytes()
+        return SudokuCodec.pack(self.puzzle).tobytes()
+
+    #rebuilds a Sudoku from to_bytes() output, the length tells if the solution was included
+    @classmethod
+    def from_bytes(cls, data, diff = None):
+
+        #sets what __init__() would without its seeding, a loaded board has no seed to make it again
+        sudoku = cls.__new__(cls)
+        sudoku.name = None
+        sudoku.creator = None
+        sudoku.subject = None
+        sudoku.seed = None
+        sudoku.rng = None
+        sudoku.np_rng = None
+        sudoku.box = 3
+        sudoku.size = 9
+        sudoku.difficulty = diff
+        sudoku.unique = False
+        sudoku.graded = False
+        sudoku.symmetry = None
+        sudoku.minimal = False
+        sudoku.mask = None
+        sudoku.score = None
+        sudoku.tier = None
+        sudoku.solution = None
+        sudoku.generation_time = None
+        sudoku.max_attempts = None
+        sudoku.timeout = None
+        sudoku.reset_stats()
+        sudoku.corners = [(i, j) for i in range(0, 9, 3) for j in range(0, 9, 3)][1:-1]
+        if len(data) == SudokuCodec.PAIR_BYTES:
+            puzzles, solutions = SudokuCodec.from_buffer(data, pair=True)
+            sudoku.solution = solutions[0].astype(np.int64)
+        elif len(data) == SudokuCodec.BOARD_BYTES:
+            puzzles = SudokuCodec.from_buffer(data)
+        else:
+            raise ValueError("expected %d or %d bytes, got %d" % (
+                SudokuCodec.BOARD_BYTES, SudokuCodec.PAIR_BYTES, len(data)
+            ))
+        sudoku.puzzle = puzzles[0].astype(np.int64)
+        sudoku.puz_json = json.dumps(sudoku.puzzle.tolist())
+        return sudoku
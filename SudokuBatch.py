@@ -0,0 +1,124 @@
+"""
+****************************************************************************************************
+
+                            ----Batched Sudoku Generation----
+
+****************************************************************************************************
+
+Purpose:
+    Produces very large numbers of Sudoku boards at once as a single (n, 9, 9) uint8 array, for when the
+    puzzles are pre-generated in bulk rather than created one at a time by Sudoku(diff).
+
+The Algorithm:
+    Only a small set of seed boards is created by the normal generator. Every other board is made by
+    applying changes to a seed that can never break the rules of Sudoku:
+        - relabeling the numbers (every 1 becomes a 7, every 7 becomes a 2, ...)
+        - reordering the three bands of rows and the three stacks of columns
+        - reordering the rows inside each band and the columns inside each stack
+        - transposing the board
+    There are 9! * 6^8 * 2 (over 1.2 trillion) of these for every seed. All of them are done for the whole
+    batch at once with numpy indexing, in chunks so that the index arrays stay small.
+
+    Hiding works the same way. Either a random mask with the right number of revealed squares is made for
+    every board, or (when the seeds were hidden with a unique solution) the seed's mask is moved by the
+    same row/column reordering as its board, which keeps the solution unique.
+
+"""
+
+import numpy as np
+
+
+CHUNK = 1 << 16     #boards transformed per numpy pass
+
+
+#random reorderings of the 9 rows (or columns) that keep the bands together, shape (n, 9)
+def band_orders(n, rng):
+    bands = rng.random((n, 3)).argsort(axis=1)
+    inner = rng.random((n, 3, 3)).argsort(axis=2)
+    return (bands[:, :, None] * 3 + inner).reshape(n, 9)
+
+
+#random relabeling tables, index 0 always stays 0 so hidden squares are unchanged, shape (n, 10)
+def relabelings(n, rng):
+    table = np.zeros((n, 10), dtype=np.uint8)
+    table[:, 1:] = rng.random((n, 9)).argsort(axis=1) + 1
+    return table
+
+
+"""
+*********************************************************************************************
+*
+*                               -- transform() --
+*
+*   Purpose: Apply one validity-preserving change per board
+*   Parameters: boards - (n, 9, 9) array, each is a seed board (or mask) for one output
+*               rows, cols - (n, 9) orderings from band_orders()
+*               flip - (n,) booleans, transpose the board first
+*               labels - (n, 10) tables from relabelings(), or None to skip (used for masks)
+*   Return Values: new (n, 9, 9) array of the same dtype
+*
+*********************************************************************************************
+"""
+def transform(boards, rows, cols, flip, labels = None):
+
+    n = len(boards)
+    out = np.where(flip[:, None, None], boards.transpose(0, 2, 1), boards)
+    out = out[np.arange(n)[:, None, None], rows[:, :, None], cols[:, None, :]]
+    if labels is not None:
+        out = np.take_along_axis(labels, out.reshape(n, 81), axis=1).reshape(n, 9, 9)
+    return out
+
+
+#random masks with exactly reveals True squares per board, shape (n, 9, 9)
+def clue_masks(n, reveals, rng):
+    if reveals >= 81:
+        return np.ones((n, 9, 9), dtype=bool)
+    keys = rng.random((n, 81))
+    cut = np.partition(keys, reveals - 1, axis=1)[:, reveals - 1:reveals]
+    return (keys <= cut).reshape(n, 9, 9)
+
+
+"""
+*********************************************************************************************
+*
+*                               -- expand() --
+*
+*   Purpose: Build a batch of boards from a few seeds
+*   Parameters: seeds - (s, 9, 9) full boards
+*               n - number of boards wanted
+*               rng - numpy Generator, a puzzle's own np_rng
+*               reveals - how many squares each puzzle shows, None returns full boards
+*               masks - optional (s, 9, 9) booleans of the seeds' own revealed squares, used
+*                       instead of random masks when given (reveals is then ignored)
+*   Return Values: (puzzles, solutions), both (n, 9, 9) uint8
+*
+*   Operation: Picks a random seed for every board and runs transform() over chunks of the batch
+*
+*********************************************************************************************
+"""
+def expand(seeds, n, rng, reveals = None, masks = None):
+
+    seeds = np.asarray(seeds, dtype=np.uint8)
+    puzzles = np.empty((n, 9, 9), dtype=np.uint8)
+    solutions = np.empty((n, 9, 9), dtype=np.uint8)
+
+    for start in range(0, n, CHUNK):
+        size = min(CHUNK, n - start)
+        pick = rng.integers(0, len(seeds), size)
+        rows = band_orders(size, rng)
+        cols = band_orders(size, rng)
+        flip = rng.random(size) < 0.5
+
+        full = transform(seeds[pick], rows, cols, flip, relabelings(size, rng))
+        solutions[start:start + size] = full
+
+        if masks is not None:
+            shown = transform(np.asarray(masks, dtype=bool)[pick], rows, cols, flip)
+        elif reveals is not None:
+            shown = clue_masks(size, reveals, rng)
+        else:
+            puzzles[start:start + size] = full
+            continue
+        puzzles[start:start + size] = np.where(shown, full, 0)
+
+    return puzzles, solutions
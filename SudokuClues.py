@@ -0,0 +1,158 @@
+"""
+****************************************************************************************************
+
+                            ----Sudoku Clue Selection----
+
+****************************************************************************************************
+
+Purpose:
+    Chooses which squares of a full board are revealed. The choice is kept as a boolean numpy mask the
+    size of the board (True = revealed) so that picking squares is done with array operations instead of
+    searching lists of coordinates.
+
+Symmetry:
+    Published puzzles often reveal squares in a symmetric pattern. Every square belongs to an "orbit", the
+    set of squares that the symmetry maps it onto:
+        None            every square is its own orbit
+        "rotational"    a square and the one opposite it through the center (180 degree turn)
+        "mirror"        a square and its reflection across the middle column
+    Squares are always revealed or hidden a whole orbit at a time, so the pattern stays symmetric.
+
+Operation:
+    random_mask() makes the masks used by hide_numbers(): at least one square in every box and every row
+    (so a board with a bad random seed is still playable) and then random extra squares. reduce_mask()
+    is used by hide_unique(). It hides orbits one at a time and keeps only the changes that leave the
+    puzzle with exactly one solution, either until a target count is reached or, with a target of 0,
+    until no revealed square can be hidden any more (a minimal puzzle).
+
+"""
+
+import numpy as np
+from DancingLinks import count_solutions
+
+
+SYMMETRIES = (None, "rotational", "mirror")
+
+
+#flat index of the square each square is mapped onto by the symmetry, shape (size, size)
+def images(size, symmetry = None):
+
+    index = np.arange(size * size).reshape(size, size)
+    if symmetry is None:
+        return index
+    if symmetry == "rotational":
+        return index[::-1, ::-1]
+    if symmetry == "mirror":
+        return index[:, ::-1]
+    raise ValueError("unknown symmetry %r, expected one of %r" % (symmetry, SYMMETRIES))
+
+
+#(size, size) array giving every square the id of its orbit (the smallest flat index in it)
+def orbits(size, symmetry = None):
+    return np.minimum(np.arange(size * size).reshape(size, size), images(size, symmetry))
+
+
+#grows a mask so that it contains the whole orbit of each of its squares
+def symmetric(mask, symmetry = None):
+    if symmetry is None:
+        return mask
+    if symmetry == "rotational":
+        return mask | mask[::-1, ::-1]
+    return mask | mask[:, ::-1]
+
+
+"""
+*********************************************************************************************
+*
+*                               -- random_mask() --
+*
+*   Purpose: Random revealed squares for hide_numbers()
+*   Parameters: box - box size of the board
+*               reveals - how many squares should be revealed in total
+*               rng - numpy Generator
+*               symmetry - one of SYMMETRIES
+*   Return Values: (size, size) boolean mask
+*
+*   Operation: Picks a random square in every box, then a random square per row that is not
+*   already revealed, then fills up to reveals with random orbits (each picked through the
+*   first square of the orbit). With a symmetry the count can end one orbit above reveals,
+*   since orbits are never split, and on hard difficulties the mirrored box and row squares
+*   alone can already be more than reveals
+*
+*********************************************************************************************
+"""
+def random_mask(box, reveals, rng, symmetry = None):
+
+    size = box * box
+    image = images(size, symmetry).reshape(-1)
+    mask = np.zeros((size, size), dtype=bool)
+
+    #one square per box
+    corner = np.arange(0, size, box)
+    rows = corner[:, None] + rng.integers(0, box, (box, box))
+    cols = corner[None, :] + rng.integers(0, box, (box, box))
+    mask[rows, cols] = True
+    mask = symmetric(mask, symmetry)
+
+    #one more square per row
+    keys = rng.random((size, size))
+    keys[mask] = 2.0
+    mask[np.arange(size), keys.argmin(axis=1)] = True
+    mask = symmetric(mask, symmetry)
+
+    #random orbits until there are enough revealed squares
+    needed = reveals - int(mask.sum())
+    if needed > 0:
+        flat = np.arange(size * size)
+        firsts = flat[(flat <= image) & ~mask.reshape(-1)]
+        firsts = firsts[rng.permutation(len(firsts))]
+        total = np.cumsum(1 + (image[firsts] != firsts))
+        mask.reshape(-1)[firsts[:np.searchsorted(total, needed) + 1]] = True
+        mask = symmetric(mask, symmetry)
+    return mask
+
+
+"""
+*********************************************************************************************
+*
+*                               -- reduce_mask() --
+*
+*   Purpose: Hide squares of a full board while the solution stays unique
+*   Parameters: solution - the full board
+*               rng - numpy Generator
+*               target - stop once at most this many squares are revealed, 0 for a minimal puzzle
+*               symmetry - one of SYMMETRIES
+*               mask - optional starting mask (all True by default)
+*   Return Values: (size, size) boolean mask
+*
+*   Operation: Visits the orbits in random order, hides each one and asks the Dancing Links
+*   solver for up to 2 solutions, putting the orbit back if a second one appears. A single pass
+*   is enough for a minimal puzzle: hiding more squares later can only add solutions, so every
+*   square that had to stay still has to
+*
+*********************************************************************************************
+"""
+def reduce_mask(solution, rng, target = 0, symmetry = None, mask = None):
+
+    solution = np.asarray(solution)
+    size = len(solution)
+    orbit = orbits(size, symmetry)
+    if mask is None:
+        mask = np.ones((size, size), dtype=bool)
+    else:
+        mask = mask.copy()
+    puzzle = np.where(mask, solution, 0)
+    revealed = int(mask.sum())
+
+    ids = np.unique(orbit[mask])
+    for k in rng.permutation(len(ids)):
+        if revealed <= target:
+            break
+        squares = (orbit == ids[k]) & mask
+        puzzle[squares] = 0
+        if count_solutions(puzzle, 2) == 1:
+            mask[squares] = False
+            revealed -= int(squares.sum())
+        else:
+            puzzle[squares] = solution[squares]
+    return mask
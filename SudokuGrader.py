@@ -0,0 +1,350 @@
+"""
+****************************************************************************************************
+
+                            ----Sudoku Difficulty Grader----
+
+****************************************************************************************************
+
+Purpose:
+    Rates how hard a puzzle is for a person instead of just counting how many numbers are shown. The
+    grader solves the puzzle the way a player would, always using the easiest technique that still makes
+    progress, and the puzzle's score is the rating of the hardest technique it needed.
+
+The Techniques (easiest first, ratings follow the usual Sudoku Explainer scale):
+    Hidden single       1.5     a number fits in only one square of a row, column or box
+    Naked single        2.3     a square has only one possible number left
+    Locked candidates   2.8     a number in a box is limited to one row/column (or the other way around),
+                                so it can be removed from the rest of that row/column (or box)
+    Naked pair          3.0     two squares of a unit share the same two possible numbers
+    X-wing              3.2     a number is limited to the same two columns in two rows (or the reverse)
+    Hidden pair         3.4     two numbers of a unit can only go in the same two squares
+    Guess               10.0    none of the above work, a square is filled from the solution
+
+Tiers:
+    The score is turned into the same 1 - 5 scale as Sudoku.difficulty, where 1 is the hardest:
+    5 needs only hidden singles, 4 naked singles, 3 locked candidates, 2 pairs or x-wings and 1 a guess.
+
+Operation:
+    The possible numbers of each empty square are kept as 9-bit masks like in Bitboard.py, and placing a
+    number clears its bit from the 20 "peers" of the square (the other squares in its row, column and
+    box). Singles are found for all squares in one pass and placed together, and the pair, x-wing and
+    locked candidate passes use every elimination they find, which keeps the number of passes (and the
+    grading time) low. Between passes the grader remembers which units changed, so hidden singles only
+    look at those, and the positions table of the pair and x-wing passes is built once per change.
+
+"""
+
+from Bitboard import FULL, ROW_OF, COL_OF, BOX_OF, BIT, DIGITS, COUNT
+from DancingLinks import solve
+import numpy as np
+
+
+#squares of every row, column and box, rows are units 0 - 8, columns 9 - 17 and boxes 18 - 26
+ROWS = [[r * 9 + c for c in range(9)] for r in range(9)]
+COLS = [[r * 9 + c for r in range(9)] for c in range(9)]
+BOXES = [[i for i in range(81) if BOX_OF[i] == b] for b in range(9)]
+UNITS = ROWS + COLS + BOXES
+PEERS = [
+    sorted(set(ROWS[ROW_OF[i]] + COLS[COL_OF[i]] + BOXES[BOX_OF[i]]) - {i}) for i in range(81)
+]
+
+#the 3 squares where row r crosses box column k, and where column c crosses box row k
+ROW_SEGMENTS = [[ROWS[r][k * 3:k * 3 + 3] for k in range(3)] for r in range(9)]
+COL_SEGMENTS = [[COLS[c][k * 3:k * 3 + 3] for k in range(3)] for c in range(9)]
+
+#27-bit mask of the units of every square
+UNIT_BITS = [1 << ROW_OF[i] | 1 << 9 + COL_OF[i] | 1 << 18 + BOX_OF[i] for i in range(81)]
+
+#(unit, position in the unit) of the three units of every square, in the order of UNITS
+SLOTS = [[(u, k) for u, unit in enumerate(UNITS) for k, j in enumerate(unit) if j == i] for i in range(81)]
+
+#for every segment, the rest of its box and the rest of its line, used by locked_candidates()
+BOX_REST = [[[i for i in BOXES[BOX_OF[seg[0]]] if i not in seg] for seg in line] for line in ROW_SEGMENTS + COL_SEGMENTS]
+LINE_REST = [[[i for j in range(3) if j != k for i in line[j]] for k in range(3)] for line in ROW_SEGMENTS + COL_SEGMENTS]
+
+RATINGS = {
+    "hidden single": 1.5,
+    "naked single": 2.3,
+    "locked candidates": 2.8,
+    "naked pair": 3.0,
+    "x-wing": 3.2,
+    "hidden pair": 3.4,
+    "guess": 10.0,
+}
+
+#highest score of each tier, from easiest (5) to hardest (1)
+TIER_LIMITS = [(5, 1.5), (4, 2.3), (3, 2.8), (2, 3.4)]
+
+
+def tier(score):
+    for t, limit in TIER_LIMITS:
+        if score <= limit:
+            return t
+    return 1
+
+
+class Grader:
+
+    def __init__(self, puzzle, solution = None):
+
+        self.cells = np.asarray(puzzle).reshape(-1).tolist()
+        self.solution = solution
+        self.cands = [0] * 81
+        self.steps = {name: 0 for name in RATINGS}
+        self.score = 0.0
+        self.left = self.cells.count(0)     #empty squares remaining
+        self.where = None                   #positions table of positions(), None once the candidates change
+        self.dirty = (1 << 27) - 1          #units whose candidates changed since hidden_singles() last looked
+
+        #starting candidates come straight from the masks of the given numbers
+        rows, cols, boxes = [0] * 9, [0] * 9, [0] * 9
+        for i, num in enumerate(self.cells):
+            if num:
+                rows[ROW_OF[i]] |= BIT[num]
+                cols[COL_OF[i]] |= BIT[num]
+                boxes[BOX_OF[i]] |= BIT[num]
+        for i, num in enumerate(self.cells):
+            if not num:
+                self.cands[i] = FULL & ~(rows[ROW_OF[i]] | cols[COL_OF[i]] | boxes[BOX_OF[i]])
+
+    def place(self, i, num):
+        bit = BIT[num]
+        cands = self.cands
+        dirty = self.dirty | UNIT_BITS[i]
+        self.cells[i] = num
+        self.left -= 1
+        self.where = None
+        cands[i] = 0
+        for p in PEERS[i]:
+            if cands[p] & bit:
+                cands[p] ^= bit
+                dirty |= UNIT_BITS[p]
+        self.dirty = dirty
+
+    #removes the bits of mask from the given squares, returns True if anything changed
+    def eliminate(self, squares, mask):
+        changed = False
+        cands = self.cands
+        for i in squares:
+            if cands[i] & mask:
+                cands[i] &= ~mask
+                self.dirty |= UNIT_BITS[i]
+                changed = True
+        if changed:
+            self.where = None
+        return changed
+
+    #where[u][num] is the 9-bit mask of the positions in unit u where num can go, kept until the candidates change
+    def positions(self):
+        if self.where is None:
+            where = [[0] * 10 for u in range(27)]
+            cands = self.cands
+            for i in range(81):
+                if cands[i]:
+                    for num in DIGITS[cands[i]]:
+                        for u, k in SLOTS[i]:
+                            where[u][num] |= 1 << k
+            self.where = where
+        return self.where
+
+    def use(self, name):
+        self.steps[name] += 1
+        if RATINGS[name] > self.score:
+            self.score = RATINGS[name]
+
+    #only the units that changed since the last look can hold a new hidden single
+    def hidden_singles(self):
+        cands, found = self.cands, []
+        dirty = self.dirty
+        self.dirty = 0
+        for u, unit in enumerate(UNITS):
+            if not dirty >> u & 1:
+                continue
+            once = twice = 0
+            for i in unit:
+                m = cands[i]
+                twice |= once & m
+                once |= m
+            single = once & ~twice
+            if single:
+                for i in unit:
+                    if cands[i] & single:
+                        found.append((i, DIGITS[cands[i] & single][0]))
+        placed = False
+        for i, num in found:
+            if self.cands[i] & BIT[num]:
+                self.place(i, num)
+                placed = True
+        return placed
+
+    def naked_singles(self):
+        placed = False
+        for i in range(81):
+            if COUNT[self.cands[i]] == 1:
+                self.place(i, DIGITS[self.cands[i]][0])
+                placed = True
+        return placed
+
+    """
+    *********************************************************************************************
+    *
+    *                               -- locked_candidates() --
+    *
+    *   Purpose: Pointing and claiming eliminations
+    *   Parameters: None
+    *   Return Values: True if any candidate was removed
+    *
+    *   Operation: ORs the candidates of each 3 square segment where a row or column crosses a
+    *   box. A number that appears in only one of the three segments of a box is pointing (clear it
+    *   from the rest of the row/column), one that appears in only one of the three segments of a
+    *   row/column is claiming (clear it from the rest of the box)
+    *
+    *********************************************************************************************
+    """
+    def locked_candidates(self):
+
+        cands = self.cands
+        changed = False
+        for first, segments in ((0, ROW_SEGMENTS), (9, COL_SEGMENTS)):
+            masks = [[cands[a] | cands[b] | cands[c] for a, b, c in line] for line in segments]
+
+            for line in range(9):
+                m = masks[line]
+                band = line - line % 3
+                o1, o2 = [j for j in range(band, band + 3) if j != line]
+                for k in range(3):
+                    line_rest = m[(k + 1) % 3] | m[(k + 2) % 3]
+                    box_rest = masks[o1][k] | masks[o2][k]
+
+                    #claiming, the number is only in this segment of the line (and still elsewhere in the box)
+                    if m[k] & box_rest & ~line_rest:
+                        changed |= self.eliminate(BOX_REST[first + line][k], m[k] & ~line_rest)
+
+                    #pointing, the number is only in this line's segment of the box (and still elsewhere in the line)
+                    if m[k] & line_rest & ~box_rest:
+                        changed |= self.eliminate(LINE_REST[first + line][k], m[k] & ~box_rest)
+        return changed
+
+    """
+    *********************************************************************************************
+    *
+    *                               -- naked_pairs(), hidden_pairs(), x_wings() --
+    *
+    *   Purpose: Pair and x-wing eliminations
+    *   Parameters: None
+    *   Return Values: True if any candidate was removed
+    *
+    *   Operation: Every pair (or x-wing) found in one pass over the units is used, not just the
+    *   first, so grade() goes back through the singles once per pass instead of once per pair.
+    *   Hidden pairs and x-wings read the positions table of positions(). It may be a little out of
+    *   date after an elimination earlier in the same pass, but positions only ever get fewer, so
+    *   a pair (or x-wing) read from it still holds
+    *
+    *********************************************************************************************
+    """
+    def naked_pairs(self):
+        cands = self.cands
+        changed = False
+        for unit in UNITS:
+            seen = {}
+            for i in unit:
+                m = cands[i]
+                if COUNT[m] == 2:
+                    if m in seen:
+                        pair = (seen[m], i)
+                        changed |= self.eliminate([j for j in unit if j not in pair], m)
+                    seen[m] = i
+        return changed
+
+    def hidden_pairs(self):
+        changed = False
+        for unit, where in zip(UNITS, self.positions()):
+            seen = {}
+            for num in range(1, 10):
+                if COUNT[where[num]] == 2:
+                    spots = where[num]
+                    if spots in seen:
+                        keep = BIT[num] | BIT[seen[spots]]
+                        squares = [unit[k] for k in range(9) if spots >> k & 1]
+                        changed |= self.eliminate(squares, FULL & ~keep)
+                    seen[spots] = num
+        return changed
+
+    def x_wings(self):
+        where = self.positions()
+        changed = False
+        for first, lines, cross in ((0, ROWS, COLS), (9, COLS, ROWS)):
+            for num in range(1, 10):
+                bit = BIT[num]
+                seen = {}
+                for a in range(9):
+                    spots = where[first + a][num]
+                    if COUNT[spots] != 2:
+                        continue
+                    if spots in seen:
+                        b = seen[spots]
+                        squares = [
+                            i for k in range(9) if spots >> k & 1
+                            for i in cross[k] if i not in lines[a] and i not in lines[b]
+                        ]
+                        changed |= self.eliminate(squares, bit)
+                    seen[spots] = a
+        return changed
+
+    #fills the most constrained square from the solution when no technique works
+    def guess(self):
+        if self.solution is None:
+            self.solution = solve(np.array(self.cells).reshape(9, 9))
+            if self.solution is None:
+                return False
+        solution = np.asarray(self.solution).reshape(-1)
+        empty = [i for i in range(81) if not self.cells[i]]
+        i = min(empty, key=lambda e: COUNT[self.cands[e]])
+        self.place(i, int(solution[i]))
+        return True
+
+    """
+    *********************************************************************************************
+    *
+    *                               -- grade() --
+    *
+    *   Purpose: Solve the puzzle with the easiest working technique at every step
+    *   Parameters: full - keep solving after the first guess, so that self.steps counts the
+    *                      techniques of the whole solve
+    *   Return Values: the score (rating of the hardest technique used)
+    *
+    *   Operation: Tries the techniques in order of their rating and starts over from the easiest
+    *   one as soon as any of them makes progress. Stops when the board is full, or when nothing
+    *   works and the puzzle has no solution to guess from. A guess is the highest rating, so
+    *   nothing after it can change the score, and unless full is set grading stops there,
+    *   which skips the failing passes of every technique before each further guess
+    *
+    *********************************************************************************************
+    """
+    def grade(self, full = False):
+
+        techniques = (
+            ("hidden single", self.hidden_singles),
+            ("naked single", self.naked_singles),
+            ("locked candidates", self.locked_candidates),
+            ("naked pair", self.naked_pairs),
+            ("x-wing", self.x_wings),
+            ("hidden pair", self.hidden_pairs),
+            ("guess", self.guess),
+        )
+        while self.left:
+            for name, technique in techniques:
+                if technique():
+                    self.use(name)
+                    break
+            else:
+                break
+            if self.steps["guess"] and not full:
+                break
+        return self.score
+
+
+#grades a puzzle, returns (score, tier)
+def grade(puzzle, solution = None):
+    score = Grader(puzzle, solution).grade()
+    return score, tier(score)
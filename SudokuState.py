@@ -0,0 +1,218 @@
+"""
+****************************************************************************************************
+
+                            ----Interactive Sudoku Game State----
+
+****************************************************************************************************
+
+Purpose:
+    Keeps track of a Sudoku game while it is being played, so that every move of a player can be checked
+    without scanning the whole board again. Built from a generated Sudoku (Sudoku.state()) or any puzzle
+    array, with zeroes for the empty squares.
+
+Operation:
+    Like the bitboard engine (Bitboard.py) the state keeps a bit mask of the numbers used in every row,
+    column and box. Unlike the engine, a player can place a number that breaks the rules, so the state
+    also counts how many times each number appears in each row, column and box. A bit is only set while
+    its count is above zero and a count above one is a conflict, and a running total of these extra
+    copies tells if the board has any conflict at all. Every move only changes three counts, so
+    apply_move(), undo(), candidates() and the conflict checks are all O(1).
+
+"""
+
+from Bitboard import layout
+import numpy as np
+
+
+class SudokuState:
+
+    def __init__(self, puzzle, solution = None, box = 3):
+
+        self.layout = layout(box)
+        self.size = self.layout.size
+        size = self.size
+        self.cells = np.asarray(puzzle).reshape(-1).tolist()
+        self.givens = [num != 0 for num in self.cells]
+        self.solution = None
+        if solution is not None:
+            self.solution = np.asarray(solution).reshape(-1).tolist()
+
+        #masks[unit] and counts[unit][num], units 0 - size-1 are rows, then columns, then boxes
+        self.masks = [0] * (size * 3)
+        self.counts = [[0] * (size + 1) for u in range(size * 3)]
+        self.clashes = 0        #extra copies of numbers in any row/column/box, 0 means no conflicts
+        self.empty = 0          #empty squares left
+        self.history = []       #stack of (index, old number, new number)
+
+        for idx, num in enumerate(self.cells):
+            if num:
+                self.add(idx, num)
+            else:
+                self.empty += 1
+
+    #the row, column and box unit of a square
+    def units(self, idx):
+        lay = self.layout
+        return (lay.row_of[idx], self.size + lay.col_of[idx], self.size * 2 + lay.box_of[idx])
+
+    def add(self, idx, num):
+        bit = self.layout.bit[num]
+        for u in self.units(idx):
+            count = self.counts[u]
+            count[num] += 1
+            if count[num] == 1:
+                self.masks[u] |= bit
+            else:
+                self.clashes += 1
+
+    def remove(self, idx, num):
+        bit = self.layout.bit[num]
+        for u in self.units(idx):
+            count = self.counts[u]
+            if count[num] > 1:
+                self.clashes -= 1
+            count[num] -= 1
+            if count[num] == 0:
+                self.masks[u] &= ~bit
+
+    #changes one square without recording it, used by apply_move() and undo()
+    def write(self, idx, num):
+        old = self.cells[idx]
+        if old:
+            self.remove(idx, old)
+        else:
+            self.empty -= 1
+        if num:
+            self.add(idx, num)
+        else:
+            self.empty += 1
+        self.cells[idx] = num
+        return old
+
+    """
+    *********************************************************************************************
+    *
+    *                               -- apply_move() --
+    *
+    *   Purpose: Play a number (or clear a square with 0)
+    *   Parameters: row, col - the square
+    *               num - the number to place, 0 to erase
+    *   Return Values: True if the square is now free of conflicts
+    *
+    *   Operation: Given squares of the puzzle cannot be changed (ValueError). Conflicting moves
+    *   are allowed, as a player may make them, and are reported through the return value and
+    *   conflict(). Every move is recorded for undo()
+    *
+    *********************************************************************************************
+    """
+    def apply_move(self, row, col, num):
+
+        if not 0 <= num <= self.size:
+            raise ValueError("number must be between 0 and %d" % self.size)
+        idx = row * self.size + col
+        if self.givens[idx]:
+            raise ValueError("square (%d, %d) is part of the puzzle" % (row, col))
+        old = self.write(idx, num)
+        self.history.append((idx, old, num))
+        return not self.conflict(row, col)
+
+    #takes back the last move, returns (row, col) of the square or None if there is nothing to undo
+    def undo(self):
+        if not self.history:
+            return None
+        idx, old, num = self.history.pop()
+        self.write(idx, old)
+        return (idx // self.size, idx % self.size)
+
+    #mask of the numbers that do not clash with anything else in the square's row, column or box
+    def candidates(self, row, col):
+        idx = row * self.size + col
+        num = self.cells[idx]
+        mask = 0
+        for u in self.units(idx):
+            mask |= self.masks[u]
+        if num and all(self.counts[u][num] == 1 for u in self.units(idx)):
+            mask &= ~self.layout.bit[num]   #the square's own number does not block itself
+        return self.layout.full & ~mask
+
+    def options(self, row, col):
+        return self.layout.digits(self.candidates(row, col))
+
+    #True if the number in (row, col) also appears elsewhere in its row, column or box
+    def conflict(self, row, col):
+        idx = row * self.size + col
+        num = self.cells[idx]
+        return num != 0 and any(self.counts[u][num] > 1 for u in self.units(idx))
+
+    #every square that is part of a conflict, O(squares) so only meant for display
+    def conflicts(self):
+        if not self.clashes:
+            return []
+        size = self.size
+        return [(i // size, i % size) for i in range(size * size) if self.conflict(i // size, i % size)]
+
+    def is_solved(self):
+        return self.empty == 0 and self.clashes == 0
+
+    #True if the square holds a number that does not match the solution (needs a solution)
+    def is_wrong(self, row, col):
+        idx = row * self.size + col
+        return self.solution is not None and self.cells[idx] not in (0, self.solution[idx])
+
+    """
+    *********************************************************************************************
+    *
+    *                               -- hint() --
+    *
+    *   Purpose: Suggest the next move for the player
+    *   Parameters: None
+    *   Return Values: (row, col, num, reason), or None if there is nothing to suggest
+    *
+    *   Operation: Prefers moves the player could find on their own, an empty square with only
+    *   one candidate ("naked single") and then a number that fits only one square of a row
+    *   ("hidden single"). If neither exists and the solution is known, the most constrained
+    *   empty square is filled from it ("solution"). Hints are only given while the board has
+    *   no conflicts, since candidates mean little on a broken board
+    *
+    *********************************************************************************************
+    """
+    def hint(self):
+
+        if self.clashes or not self.empty:
+            return None
+        size, lay = self.size, self.layout
+        cells = self.cells
+        best, best_count = -1, size + 1
+
+        for idx in range(size * size):
+            if cells[idx]:
+                continue
+            row, col = idx // size, idx % size
+            mask = self.candidates(row, col)
+            count = lay.count(mask)
+            if count == 1:
+                return (row, col, lay.digits(mask)[0], "naked single")
+            if count < best_count:
+                best, best_count = idx, count
+
+        for row in range(size):
+            once = twice = 0
+            for col in range(size):
+                if not cells[row * size + col]:
+                    m = self.candidates(row, col)
+                    twice |= once & m
+                    once |= m
+            single = once & ~twice
+            if single:
+                num = lay.digits(single)[0]
+                for col in range(size):
+                    if not cells[row * size + col] and self.candidates(row, col) & lay.bit[num]:
+                        return (row, col, num, "hidden single")
+
+        if self.solution is not None and best >= 0:
+            return (best // size, best % size, self.solution[best], "solution")
+        return None
+
+    #the board as a size by size numpy array
+    def to_array(self):
+        return np.array(self.cells, dtype=np.int64).reshape(self.size, self.size)
@@ -0,0 +1,102 @@
+"""
+****************************************************************************************************
+
+                            ----Pattern Indexed Dictionary----
+
+****************************************************************************************************
+
+Purpose:
+    Answers the question a crossword fill asks over and over: which words fit a pattern like C?T?? (a
+    length and some known letters). With a dictionary of a few hundred thousand words, scanning the list
+    for every query is far too slow, so every query here is a handful of numpy ANDs.
+
+Operation:
+    Words are grouped by length and every word of a length gets an id, its position in that group. For
+    each (length, position, letter) there is a bitset over the ids of that length, bit k set when word k
+    has the letter at the position, packed 8 ids to a byte (np.packbits, little bit order). The words
+    matching a pattern are the AND of the bitsets of its known letters, and a set of candidate words (a
+    "domain" in CrosswordFill.py) is kept in the same packed form, so the fill can narrow it with more
+    ANDs and ask which letters are still possible at a position without ever unpacking it.
+
+    Only words of the letters A - Z are kept, upper cased, each once. Letters are coded 0 - 25.
+
+Usage:
+    index = WordIndex(open("words.txt").read().split())
+    index.matches("C?T??")          ['CATCH', 'CITED', ...]
+    index.count(index.pattern("C?T??"))
+
+"""
+
+import numpy as np
+
+
+#number of set bits for every byte
+COUNT8 = np.array([bin(m).count("1") for m in range(256)], dtype=np.int64)
+
+
+class WordIndex:
+
+    def __init__(self, words):
+
+        groups = {}
+        for word in set(w.strip().upper() for w in words):
+            if word.isalpha() and word.isascii():
+                groups.setdefault(len(word), []).append(word)
+
+        self.words = {}         #length -> sorted list of words, the position is the id
+        self.codes = {}         #length -> (words, length) uint8 array of letter codes
+        self.bits = {}          #length -> (length, 26, bytes) packed bitsets
+        for length, group in groups.items():
+            group.sort()
+            codes = (np.frombuffer("".join(group).encode(), dtype=np.uint8) - ord("A")).reshape(-1, length)
+            letters = codes.T[:, None, :] == np.arange(26, dtype=np.uint8)[None, :, None]
+            self.words[length] = group
+            self.codes[length] = codes
+            self.bits[length] = np.packbits(letters, axis=2, bitorder="little")
+
+    def __len__(self):
+        return sum(len(group) for group in self.words.values())
+
+    def lengths(self):
+        return sorted(self.words)
+
+    #packed bitset of every word of a length
+    def full(self, length):
+        count = len(self.words.get(length, ()))
+        return np.packbits(np.ones(count, dtype=bool), bitorder="little")
+
+    #packed bitset of the words matching a pattern, ? (or any other non letter) is an unknown square
+    def pattern(self, pattern):
+        pattern = pattern.upper()
+        domain = self.full(len(pattern))
+        bits = self.bits.get(len(pattern))
+        if bits is None:
+            return domain
+        for position, letter in enumerate(pattern):
+            if "A" <= letter <= "Z":
+                domain &= bits[position, ord(letter) - ord("A")]
+        return domain
+
+    #number of words in a packed bitset
+    def count(self, domain):
+        return int(COUNT8[domain].sum())
+
+    #word ids in a packed bitset, in order
+    def ids(self, domain, length):
+        return np.flatnonzero(np.unpackbits(domain, count=len(self.words[length]), bitorder="little"))
+
+    #the words matching a pattern
+    def matches(self, pattern):
+        length = len(pattern)
+        if length not in self.words:
+            return []
+        group = self.words[length]
+        return [group[k] for k in self.ids(self.pattern(pattern), length)]
+
+    #boolean array of the 26 letters some word of the domain has at a position
+    def letters(self, domain, length, position):
+        return (self.bits[length][position] & domain).any(axis=1)
+
+    #the words of the domain with one of the allowed letters (boolean array of 26) at a position
+    def restrict(self, domain, length, position, allowed):
+        return domain & np.bitwise_or.reduce(self.bits[length][position][allowed], axis=0)
@@ -32,8 +32,6 @@
 ************************************************************************************************************************************
 """
 
-import numpy as np
-import random as r
 import json
 
 from Puzzle import Puzzle
@@ -41,9 +39,9 @@ from Puzzle import Puzzle
 class WordSearch(Puzzle):
 
     def __init__(self, word_bank = None, diff = None,
-        name = None, creator = None, subject = None):
+        name = None, creator = None, subject = None, seed = None):
 
-        super().__init__(name, creator, subject)
+        super().__init__(name, creator, subject, seed)
 
         self.difficulty = diff
         self.word_bank = word_bank
@@ -53,7 +51,7 @@ class WordSearch(Puzzle):
         self.puz_size = 20
         self.long = 0
         self.puz_json = None
-        self.puzzle = np.random.randint(ord('A'), ord('Z'),
+        self.puzzle = self.np_rng.integers(ord('A'), ord('Z'),
             size = (self.puz_size, self.puz_size))
 
         if self.word_bank != None:
@@ -85,12 +83,12 @@ class WordSearch(Puzzle):
     """
     def place_word(self, warr):
 
-        ori = r.randint(1, 8)
+        ori = self.rng.randint(1, 8)
 
         # horizontal, left to right
         if ori == 1:
-            row = r.randint(0, self.puz_size-1)
-            col = r.randint(0, self.puz_size-len(warr))
+            row = self.rng.randint(0, self.puz_size-1)
+            col = self.rng.randint(0, self.puz_size-len(warr))
             check = []
             for i, v in enumerate(warr):
                 check.append((row, col+i, v))
@@ -98,8 +96,8 @@ class WordSearch(Puzzle):
 
         #horizontal, right to left
         if ori == 2:
-            row = r.randint(0, self.puz_size-1)
-            col = r.randint(len(warr)-1, self.puz_size-1)
+            row = self.rng.randint(0, self.puz_size-1)
+            col = self.rng.randint(len(warr)-1, self.puz_size-1)
             check = []
             for i, v in enumerate(warr):
                 check.append((row, col-i, v))
@@ -107,8 +105,8 @@ class WordSearch(Puzzle):
 
         #vertical, top to bottom
         if ori == 3:
-            row = r.randint(0, self.puz_size-len(warr))
-            col = r.randint(0, self.puz_size-1)
+            row = self.rng.randint(0, self.puz_size-len(warr))
+            col = self.rng.randint(0, self.puz_size-1)
             check = []
             for i, v in enumerate(warr):
                 check.append((row+i, col, v))
@@ -116,8 +114,8 @@ class WordSearch(Puzzle):
 
         #vertical, bottom to top
         if ori == 4:
-            row = r.randint(len(warr)-1, self.puz_size-1)
-            col = r.randint(0, self.puz_size-1)
+            row = self.rng.randint(len(warr)-1, self.puz_size-1)
+            col = self.rng.randint(0, self.puz_size-1)
             check = []
             for i, v in enumerate(warr):
                 check.append((row-i, col, v))
@@ -125,8 +123,8 @@ class WordSearch(Puzzle):
 
         #diagonal down(\), left to right
         if ori == 5:
-            row = r.randint(0, self.puz_size-len(warr))
-            col = r.randint(0, self.puz_size-len(warr))
+            row = self.rng.randint(0, self.puz_size-len(warr))
+            col = self.rng.randint(0, self.puz_size-len(warr))
             check = []
             for i, v in enumerate(warr):
                 check.append((row+i, col+i, v))
@@ -134,8 +132,8 @@ class WordSearch(Puzzle):
 
         #diagonal down(\), right to left
         if ori == 6:
-            row = r.randint(len(warr)-1, self.puz_size-1)
-            col = r.randint(len(warr)-1, self.puz_size-1)
+            row = self.rng.randint(len(warr)-1, self.puz_size-1)
+            col = self.rng.randint(len(warr)-1, self.puz_size-1)
             check = []
             for i, v in enumerate(warr):
                 check.append((row-i, col-i, v))
@@ -143,8 +141,8 @@ class WordSearch(Puzzle):
 
         #diagonal up(/), left to right
         if ori == 7:
-            row = r.randint(len(warr)-1, self.puz_size-1)
-            col = r.randint(0, self.puz_size-len(warr))
+            row = self.rng.randint(len(warr)-1, self.puz_size-1)
+            col = self.rng.randint(0, self.puz_size-len(warr))
             check = []
             for i, v in enumerate(warr):
                 check.append((row-i, col+i, v))
@@ -152,8 +150,8 @@ class WordSearch(Puzzle):
 
         #diagonal up(/), right to left
         if ori == 8:
-            row = r.randint(0, self.puz_size-len(warr))
-            col = r.randint(len(warr)-1, self.puz_size-1)
+            row = self.rng.randint(0, self.puz_size-len(warr))
+            col = self.rng.randint(len(warr)-1, self.puz_size-1)
             check = []
             for i, v in enumerate(warr):
                 check.append((row+i, col-i, v))
@@ -226,7 +224,7 @@ class WordSearch(Puzzle):
     def scramble(self):
 
         #randomizes the puzzle with random values
-        puzzle = np.random.randint(ord('A'), ord('Z'),
+        puzzle = self.np_rng.integers(ord('A'), ord('Z'),
             size = (self.puz_size, self.puz_size))
 
         for word in self.word_bank:
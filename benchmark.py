@@ -0,0 +1,129 @@
+"""
+****************************************************************************************************
+
+                            ----Puzzle Generation Benchmarks----
+
+****************************************************************************************************
+
+Purpose:
+    Timing runs for the puzzle generators, used to compare algorithms and board sizes before changing
+    the defaults of the puzzle API.
+
+Usage:
+    python benchmark.py                 runs every benchmark
+    python benchmark.py sudoku maze     runs only the named benchmark(s)
+    python benchmark.py tiles           reports peak memory, so it is best run on its own
+    python benchmark.py portfolio       compare one attempt per puzzle with the first of one per core
+
+"""
+
+import os
+import sys
+import time
+import resource
+import tempfile
+import numpy as np
+
+from Sudoku import Sudoku
+from Maze import Maze
+from MazeGenerators import ALGORITHMS
+from MazeTiles import TiledMaze
+from Crossword import Crossword
+from Portfolio import Portfolio
+
+
+#runs fn count times and returns the list of times in seconds
+def timings(fn, count):
+    times = []
+    for i in range(0, count):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return times
+
+
+def report(label, times):
+    times = np.array(times) * 1000
+    print("%-28s n=%-5d mean %9.2f ms   p50 %9.2f ms   p99 %9.2f ms   max %9.2f ms" % (
+        label, len(times), times.mean(), np.percentile(times, 50), np.percentile(times, 99), times.max()
+    ))
+
+
+#full board generation time for each supported Sudoku size
+def bench_sudoku():
+    for box, count in ((3, 200), (4, 50), (5, 10)):
+        maker = Sudoku(box=box)
+        times = []
+        for i in range(0, count):
+            maker.sudoku_array()
+            times.append(maker.generation_time)
+        report("sudoku %dx%d" % (box * box, box * box), times)
+
+
+#maze generation time for every algorithm
+def bench_maze():
+    for size, count in ((51, 20), (101, 10), (201, 3), (501, 3), (1001, 1)):
+        for algorithm in ["branching"] + sorted(ALGORITHMS):
+            seeds = iter(range(count))
+            times = timings(lambda: Maze(height=size, width=size, seed=next(seeds), algorithm=algorithm), count)
+            report("maze %s %dx%d" % (algorithm, size, size), times)
+
+
+#maze analysis time, the branching maze and a depth first one whose corridors give it a level for almost every square
+def bench_analysis():
+    for size, count in ((201, 10), (501, 5), (1001, 3), (2001, 1)):
+        for algorithm in ("branching", "dfs"):
+            maze = Maze(height=size, width=size, seed=0, algorithm=algorithm)
+            report("analyze %s %dx%d" % (algorithm, size, size), timings(maze.analyze, count))
+
+
+#out of core maze generation, points per second and the peak memory of the process (run it on its own for that)
+def bench_tiles():
+    path = os.path.join(tempfile.gettempdir(), "benchmark.maze")
+    try:
+        for size in (2049, 4097):
+            start = time.perf_counter()
+            maze = TiledMaze(path, height=size, width=size, seed=1)
+            elapsed = time.perf_counter() - start
+            print("%-28s %9.2f s   %10.0f points/s   peak rss %7.1f MB" % (
+                "tiles %dx%d" % (size, size), elapsed, maze.stats["points"] / elapsed,
+                resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+            ))
+    finally:
+        if os.path.exists(path):
+            os.remove(path)
+
+
+#crossword and maze latency with one attempt per puzzle against the first success of a Portfolio run on every core
+def bench_portfolio():
+    rng = np.random.default_rng(7)
+    letters = np.array(list("ABCDEFGHIJKLMNOPQRSTUVWXYZ"))
+    bank = ["".join(rng.choice(letters, size=rng.integers(4, 9))) for i in range(20)]
+    seeds = iter(range(100))
+    report("crossword single", timings(lambda: Crossword(list(bank), None, seed=next(seeds)), 100))
+    seeds = iter(range(20))
+    report("maze 201x201 single", timings(lambda: Maze(height=201, width=201, seed=next(seeds)), 20))
+
+    with Portfolio() as portfolio:
+        seeds = iter(range(20))
+        report("crossword portfolio x%d" % portfolio.workers,
+            timings(lambda: portfolio.run(Crossword, seed=next(seeds), word_bank=list(bank), questions=None), 20))
+
+        seeds = iter(range(20))
+        report("maze 201x201 portfolio x%d" % portfolio.workers,
+            timings(lambda: portfolio.run(Maze, seed=next(seeds), height=201, width=201), 20))
+
+
+BENCHMARKS = {
+    "sudoku": bench_sudoku,
+    "maze": bench_maze,
+    "analysis": bench_analysis,
+    "tiles": bench_tiles,
+    "portfolio": bench_portfolio,
+}
+
+
+if __name__ == "__main__":
+    names = sys.argv[1:] or list(BENCHMARKS)
+    for name in names:
+        BENCHMARKS[name]()
@@ -0,0 +1,37 @@
+import time
+from Puzzle import Puzzle
+from Portfolio import Portfolio
+from Maze import Maze
+
+
+#a puzzle that succeeds at once, or with fast = False searches until the run is over
+class Spin(Puzzle):
+
+    def __init__(self, seed = None, fast = True):
+        super().__init__(seed=seed)
+        self.solved = fast
+        while not self.solved and not self.stopped():
+            time.sleep(0.001)
+
+
+#a Maze only comes back from the workers through Maze.__getstate__(), every attempt has to arrive whole
+def test_maze_comes_back_whole():
+    with Portfolio(workers=2) as portfolio:
+        maze = portfolio.run(Maze, seed=1, height=51, width=51)
+        assert maze is not None
+        assert not portfolio.stats["errors"]
+        assert (Maze(height=51, width=51, seed=portfolio.stats["winner_seed"]).maze == maze.maze).all()
+
+
+def test_losing_attempts_stop_and_the_pool_is_kept():
+    with Portfolio(workers=2, attempts=4, timeout=0.2) as portfolio:
+        start = time.perf_counter()
+        assert portfolio.run(Spin, seed=0, fast=False) is None
+        assert portfolio.stats["cancelled"] == 4
+        pool = portfolio.pool
+
+        #the spinning attempts gave up at the deadline, so the next runs get the same workers right away
+        for seed in range(1, 4):
+            assert portfolio.run(Spin, seed=seed) is not None
+            assert portfolio.pool is pool
+        assert time.perf_counter() - start < 5